@@ -1,14 +1,22 @@
 from datetime import datetime, timedelta
 from typing import Union
+from concurrent.futures import ThreadPoolExecutor
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+import asyncio
 import os
+from app.services.metrics import stage
 
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-should-be-in-env")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# bcrypt runs on its own small thread pool (it releases the GIL) so hashing never blocks the event loop
+AUTH_WORKERS = int(os.getenv("AUTH_WORKERS", "4"))
+# Hash/verify calls allowed to be running or queued before new ones are refused
+AUTH_MAX_PENDING = int(os.getenv("AUTH_MAX_PENDING", "32"))
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password, hashed_password):
@@ -17,6 +25,50 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+def _timed_bcrypt(fn, *args):
+    # Timed on the worker thread so queueing behind other hashes isn't counted
+    with stage("bcrypt"):
+        return fn(*args)
+
+class AuthWorkersSaturated(Exception):
+    """Raised when too many password hashes are already queued."""
+
+class PasswordHasher:
+    """Runs bcrypt on a size-limited executor with a bounded queue."""
+
+    def __init__(self, workers: int = AUTH_WORKERS, max_pending: int = AUTH_MAX_PENDING):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auth")
+        self._pending = 0
+        self.rejected = 0
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise AuthWorkersSaturated("Too many authentication requests in progress")
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, _timed_bcrypt, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def verify(self, plain_password, hashed_password) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password) -> str:
+        return await self._run(get_password_hash, password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self._executor._max_workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+password_hasher = PasswordHasher()
+
 def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None):
     to_encode = data.copy()
     if expires_delta:
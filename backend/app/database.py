@@ -1,10 +1,21 @@
 import os
+import json
+import base64
+import logging
+from datetime import datetime
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING
 from dotenv import load_dotenv
+from app.services.metrics import stage
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 MONGO_DETAILS = os.getenv("MONGO_DETAILS", "mongodb://localhost:27017")
+# Store climate readings in a MongoDB time-series collection (timestamps become BSON dates)
+CLIMATE_TIMESERIES = os.getenv("CLIMATE_TIMESERIES", "0") == "1"
 
 class Database:
     client: AsyncIOMotorClient = None
@@ -13,12 +24,103 @@ db = Database()
 
 async def connect_to_mongo():
     db.client = AsyncIOMotorClient(MONGO_DETAILS)
-    print("Connected to MongoDB")
+    logger.info("Connected to MongoDB")
 
 async def close_mongo_connection():
     if db.client:
         db.client.close()
-        print("Closed MongoDB connection")
+        logger.info("Closed MongoDB connection")
 
 def get_database():
     return db.client.earth_scape_climate_prediction
+
+async def ensure_indexes():
+    """Creates the collections' indexes; safe to run on every startup."""
+    database = get_database()
+    try:
+        if CLIMATE_TIMESERIES and "climate_data" not in await database.list_collection_names():
+            await database.create_collection(
+                "climate_data",
+                timeseries={"timeField": "timestamp", "metaField": "location", "granularity": "hours"},
+            )
+        climate = database.get_collection("climate_data")
+        await climate.create_index([("location", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)])
+        await climate.create_index([("timestamp", ASCENDING), ("_id", ASCENDING)])
+        await database.get_collection("users").create_index([("username", ASCENDING)], unique=True)
+        notifications = database.get_collection("notifications")
+        await notifications.create_index([("timestamp", DESCENDING), ("_id", DESCENDING)])
+        await notifications.create_index([("read", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)])
+        logger.info("MongoDB indexes are in place")
+    except Exception as e:
+        logger.error("Could not create MongoDB indexes: %s", e)
+
+def encode_cursor(values: dict) -> str:
+    """Opaque keyset cursor from the sort-key values of the last document on a page."""
+    state = {}
+    for key, value in values.items():
+        if isinstance(value, ObjectId):
+            state[key] = {"$oid": str(value)}
+        elif isinstance(value, datetime):
+            state[key] = {"$date": value.isoformat()}
+        else:
+            state[key] = value
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        values = {}
+        for key, value in state.items():
+            if isinstance(value, dict) and "$oid" in value:
+                values[key] = ObjectId(value["$oid"])
+            elif isinstance(value, dict) and "$date" in value:
+                values[key] = datetime.fromisoformat(value["$date"])
+            else:
+                values[key] = value
+        return values
+    except Exception:
+        raise ValueError("Malformed cursor")
+
+def projection_for(fields: str | None):
+    """Mongo projection from a comma-separated field list; None returns whole documents."""
+    if not fields:
+        return None
+    return {field.strip(): 1 for field in fields.split(",") if field.strip()}
+
+async def keyset_page(collection, query: dict, sort_keys: list[str], after: str = None,
+                      limit: int = 100, projection: dict = None, descending: bool = False):
+    """One page of `query` ordered by `sort_keys`, resuming after a cursor.
+
+    Keyset pagination: the cursor holds the last document's sort-key values, so
+    each page is an index range scan no matter how deep the client has paged.
+    Returns (documents, next_cursor).
+    """
+    if after:
+        last = decode_cursor(after)
+        if set(last) != set(sort_keys):
+            raise ValueError("Cursor does not belong to this listing")
+        # (k1, k2, ...) > (v1, v2, ...) expanded into an $or of prefix matches (< when descending)
+        operator = "$lt" if descending else "$gt"
+        clauses = []
+        for i, key in enumerate(sort_keys):
+            clause = {k: last[k] for k in sort_keys[:i]}
+            clause[key] = {operator: last[key]}
+            clauses.append(clause)
+        query = {"$and": [query, {"$or": clauses}]} if query else {"$or": clauses}
+
+    if projection is not None:
+        # Sort keys are needed to build the next cursor
+        projection = {**projection, **{key: 1 for key in sort_keys}}
+
+    direction = DESCENDING if descending else ASCENDING
+    cursor = collection.find(query, projection).sort([(key, direction) for key in sort_keys]).limit(limit + 1)
+    with stage("mongo"):
+        documents = await cursor.to_list(limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor({key: documents[-1].get(key) for key in sort_keys})
+    for document in documents:
+        document["_id"] = str(document["_id"])
+    return documents, next_cursor
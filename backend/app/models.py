@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Literal
 from datetime import datetime
 
 class ClimateDataSchema(BaseModel):
@@ -39,12 +39,49 @@ class PredictionRequest(BaseModel):
     city: str
     country: str
 
+class BatchPredictionRequest(BaseModel):
+    items: List[PredictionRequest] = Field(..., min_length=1, max_length=1000)
+    concurrency: int = Field(16, ge=1, le=64, description="Maximum upstream lookups in flight")
+
+class TrainingRequest(BaseModel):
+    n_estimators: int = Field(100, ge=1, le=2000)
+    n_jobs: Optional[int] = Field(None, description="Parallel tree builders in the training process; -1 uses every core")
+
+class FeatureRow(BaseModel):
+    humidity: Optional[float] = None
+    co2_levels: Optional[float] = None
+    wind_speed: Optional[float] = None
+    rainfall: Optional[float] = None
+    pressure: Optional[float] = None
+
+class ModelPredictionRequest(BaseModel):
+    rows: Optional[List[FeatureRow]] = Field(None, max_length=100000)
+    city: Optional[str] = None
+    country: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if not self.rows and not self.city:
+            raise ValueError("Provide either feature rows or a city to resolve them from the dataset")
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "rows": [{"humidity": 65.0, "co2_levels": 415.2, "wind_speed": 12.0, "rainfall": 0.0, "pressure": 1012.0}]
+            }
+        }
+
 class AnalyticsRequest(BaseModel):
     variables: List[str]
     city: Optional[str] = None
     country: Optional[str] = None
     start_date: Optional[str] = None
     end_date: Optional[str] = None
+    max_points: Optional[int] = Field(None, ge=3, description="Downsample each plotted series to at most this many points")
+    method: Literal["lttb", "minmax"] = "lttb"
 
 
 class User(BaseModel):
@@ -57,6 +94,17 @@ class Feedback(BaseModel):
     message: str
     rating: int = Field(..., ge=1, le=5, description="Rating from 1 to 5")
 
+class FeedbackFields(BaseModel):
+    """A stored feedback entry, limited to the fields a listing asked for."""
+    name: Optional[str] = None
+    email: Optional[str] = None
+    message: Optional[str] = None
+    rating: Optional[int] = Field(None, ge=1, le=5)
+
+class FeedbackPage(BaseModel):
+    items: List[FeedbackFields]
+    next_cursor: Optional[str] = None
+
 class UserCreate(User):
     password: str
 
@@ -1,32 +1,154 @@
-from fastapi import APIRouter, HTTPException, Body
+import asyncio
+from typing import Literal
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from app.models import AnalyticsRequest
 from app.services.analytics_service import analytics_service
+from app.services.chart_cache import chart_cache, make_chart_key
+from app.services.render_pool import render_pool, RenderQueueFull, RenderTimeout
+from app.services.serialization import frame_to_records, frame_to_columnar, iter_ndjson, iter_json_array, FastJSONResponse
 
 router = APIRouter()
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
+
+async def _cached_chart(request: Request, response: Response, chart: str, **params):
+    """Serves a rendered chart from the cache, rendering it on a miss.
+
+    Returns the base64 image, or a 304 response if the client's copy is current.
+    The ETag is derived from the cache key, so an unchanged chart is answered
+    without touching the cache or rendering anything.
+    """
+    service = await analytics_service.aget()
+    key = make_chart_key(chart, service.data_version, **params)
+    etag = f'"{key}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    image_base64 = chart_cache.get(key)
+    if image_base64 is None:
+        try:
+            image_base64 = await render_pool.render(chart, **params)
+        except RenderQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+        except RenderTimeout as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        if image_base64:
+            chart_cache.put(key, image_base64)
+
+    if image_base64:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+    return image_base64
+
 @router.get("/correlation", response_description="Get Correlation Matrix")
-async def get_correlation_matrix(city: str = None, country: str = None):
-    image_base64 = analytics_service.generate_correlation_matrix(city=city, country=country)
+async def get_correlation_matrix(request: Request, response: Response, city: str = None, country: str = None):
+    image_base64 = await _cached_chart(request, response, "correlation", city=city, country=country)
+    if isinstance(image_base64, Response):
+        return image_base64
     if not image_base64:
         # Return none to handle gracefully on frontend
         return {"image": None}
     return {"image": image_base64}
 
+@router.get("/correlation/matrix", response_description="Get Correlation Matrix as JSON")
+async def get_correlation_values(city: str = None, country: str = None):
+    service = await analytics_service.aget()
+    corr = service.get_correlation(city=city, country=country)
+    if corr is None:
+        return {"variables": [], "matrix": []}
+    matrix = [[None if v != v else round(v, 6) for v in row] for row in corr.to_numpy().tolist()]
+    return {"variables": list(corr.columns), "matrix": matrix}
+
 @router.post("/comparison", response_description="Compare Variables")
-async def compare_variables(request: AnalyticsRequest):
-    image_base64 = analytics_service.generate_variable_comparison(
-        request.variables, 
-        city=request.city,
-        country=request.country
+async def compare_variables(request: AnalyticsRequest, http_request: Request, response: Response):
+    image_base64 = await _cached_chart(
+        http_request, response, "comparison",
+        variables=request.variables, city=request.city, country=request.country,
+        max_points=request.max_points, method=request.method,
     )
+    if isinstance(image_base64, Response):
+        return image_base64
     if not image_base64:
         raise HTTPException(status_code=400, detail="Could not generate comparison plot")
     return {"image": image_base64}
 
+@router.get("/render/stats", response_description="Chart Render Pool Statistics")
+async def get_render_stats():
+    return render_pool.stats()
+
+@router.get("/charts/cache", response_description="Rendered Chart Cache Statistics")
+async def get_chart_cache_stats():
+    return chart_cache.stats()
+
+def _csv_param(value: str):
+    return [item.strip() for item in value.split(",") if item.strip()] if value else []
+
+@router.get("/aggregate", response_description="Get Pre-aggregated Climate Series")
+async def get_aggregates(grain: Literal["day", "week", "month", "year"] = "month",
+                         agg: str = Query("mean", description="Comma-separated: mean, min, max, sum, count, std"),
+                         vars: str = Query(None, description="Comma-separated variables; all numeric variables if omitted"),
+                         city: str = None, country: str = None, start_date: str = None, end_date: str = None,
+                         window: int = Query(None, ge=1, le=366, description="Rolling mean over this many periods")):
+    service = await analytics_service.aget()
+    try:
+        series = service.get_aggregates(
+            grain, _csv_param(agg), _csv_param(vars), city=city, country=country,
+            start_date=start_date, end_date=end_date, window=window,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"grain": grain, "window": window, "series": series}
+
+@router.get("/anomalies", response_description="Get Detected Climate Anomalies")
+async def get_anomalies(city: str = None, country: str = None, start_date: str = None, end_date: str = None,
+                        threshold: float = Query(0.0, description="Flag rows scoring below this; lower is stricter"),
+                        limit: int = Query(500, ge=1, le=10000)):
+    service = await analytics_service.aget()
+    # The first call fits the detectors, so keep it off the event loop
+    return await asyncio.to_thread(
+        service.get_anomalies, city=city, country=country,
+        start_date=start_date, end_date=end_date, threshold=threshold, limit=limit,
+    )
+
 @router.get("/data", response_description="Get Historical Data for Interactive Charts")
-async def get_historical_data(city: str = None, country: str = None, start_date: str = None, end_date: str = None):
-    data = analytics_service.get_all_data(city=city, country=country, start_date=start_date, end_date=end_date)
-    if not data:
-        # Return empty list instead of 404 so frontend can handle it gracefully
-        return {"data": []}
-    return {"data": data}
+async def get_historical_data(city: str = None, country: str = None, start_date: str = None, end_date: str = None,
+                              max_points: int = Query(None, ge=3, description="Downsample each city's series to at most this many rows"),
+                              method: Literal["lttb", "minmax"] = "lttb",
+                              stream: Literal["ndjson", "json"] = Query(None, description="Stream rows in chunks instead of buffering the response"),
+                              cursor: str = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+                              limit: int = Query(None, ge=1, le=10000, description="Page size; enables cursor pagination"),
+                              format: Literal["records", "columns"] = Query("records", description="columns returns {columns, data: {column: [values]}}")):
+    filters = dict(city=city, country=country, start_date=start_date, end_date=end_date,
+                   max_points=max_points, method=method)
+    service = await analytics_service.aget()
+
+    def body(df):
+        if format == "columns":
+            return frame_to_columnar(df if df is not None else pd.DataFrame())
+        return {"data": frame_to_records(df) if df is not None else []}
+
+    if cursor or limit:
+        try:
+            page, next_cursor = service.get_data_page(cursor=cursor, limit=limit or 1000, **filters)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FastJSONResponse({**body(page), "next_cursor": next_cursor})
+
+    if stream:
+        if format == "columns":
+            raise HTTPException(status_code=400, detail="Only the records format can be streamed")
+        df = service.get_data_frame(**filters)
+        df = df if df is not None else pd.DataFrame()
+        if stream == "ndjson":
+            return StreamingResponse(iter_ndjson(df), media_type="application/x-ndjson")
+        return StreamingResponse(iter_json_array(df), media_type="application/json")
+
+    # An empty result is an empty list rather than a 404 so the frontend can handle it gracefully
+    return FastJSONResponse(body(service.get_data_frame(**filters)))
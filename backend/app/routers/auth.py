@@ -1,43 +1,63 @@
+import logging
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from app.auth.security import create_access_token, get_password_hash, verify_password, ACCESS_TOKEN_EXPIRE_MINUTES
+from pymongo.errors import DuplicateKeyError
+from app.auth.security import create_access_token, password_hasher, AuthWorkersSaturated, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.models import UserCreate, Token, User
 from app.database import get_database
 from app.models import UserInDB
+from app.services.metrics import stage
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
+logger = logging.getLogger(__name__)
+
+def _username_taken() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Username already registered"
+    )
+
+def _auth_busy() -> HTTPException:
+    # Fail fast instead of queueing behind a burst of bcrypt work
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, try again shortly",
+        headers={"Retry-After": "1"},
+    )
 
 @router.post("/register", response_model=User)
 async def register(user: UserCreate):
     try:
-        print(f"Registering user: {user.username}")
+        logger.debug("Registering user: %s", user.username)
         db = get_database()
-        print(f"Database object obtained: {db}")
-        
-        existing_user = await db["users"].find_one({"username": user.username})
-        print(f"Existing user check complete: {existing_user}")
-        
+
+        with stage("mongo"):
+            existing_user = await db["users"].find_one({"username": user.username})
+
         if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already registered"
-            )
-        
-        print("Hashing password...")
-        hashed_password = get_password_hash(user.password)
-        print("Password hashed")
-        
+            raise _username_taken()
+
+        hashed_password = await password_hasher.hash(user.password)
+
         user_in_db = UserInDB(**user.dict(exclude={"password"}), hashed_password=hashed_password)
-        
-        print("Inserting into DB...")
-        await db["users"].insert_one(user_in_db.dict())
-        print("Insertion complete")
-        
+
+        try:
+            with stage("mongo"):
+                await db["users"].insert_one(user_in_db.dict())
+        except DuplicateKeyError:
+            # A concurrent registration took the name after the check above
+            raise _username_taken()
+        logger.info("Registered user %s", user.username)
+
         return user
+    except HTTPException:
+        raise
+    except AuthWorkersSaturated:
+        raise _auth_busy()
     except Exception as e:
-        print(f"Registration Error: {e}")
+        logger.error("Registration failed for %s: %s", user.username, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Registration failed: {str(e)}"
@@ -46,7 +66,8 @@ async def register(user: UserCreate):
 @router.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
     db = get_database()
-    user_dict = await db["users"].find_one({"username": form_data.username})
+    with stage("mongo"):
+        user_dict = await db["users"].find_one({"username": form_data.username})
     if not user_dict:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -54,7 +75,11 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if not verify_password(form_data.password, user_dict["hashed_password"]):
+    try:
+        verified = await password_hasher.verify(form_data.password, user_dict["hashed_password"])
+    except AuthWorkersSaturated:
+        raise _auth_busy()
+    if not verified:
          raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
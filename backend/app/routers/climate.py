@@ -1,23 +1,159 @@
-from fastapi import APIRouter, Body, HTTPException, status
+import json
+from datetime import datetime, timezone
+from fastapi import APIRouter, Body, HTTPException, Query, Request, status
 from fastapi.encoders import jsonable_encoder
-from typing import List
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
 
-from app.models import ClimateDataSchema, ClimateDataUpdate
-from app.database import get_database
+from app.models import ClimateDataSchema
+from app.database import get_database, keyset_page, projection_for, CLIMATE_TIMESERIES
+from app.services.metrics import stage
+from app.services.serialization import FastJSONResponse
 
 router = APIRouter()
+
+BULK_CHUNK_SIZE = 500
+# Placeholder for NDJSON lines that aren't valid JSON
+_INVALID_JSON = object()
+
+def _timestamp_value(value: datetime):
+    """Timestamp as stored: BSON date in a time-series collection, otherwise an ISO string."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value if CLIMATE_TIMESERIES else value.isoformat()
+
+def _to_document(reading: ClimateDataSchema) -> dict:
+    # Let Mongo assign _id rather than storing the schema's empty id
+    document = jsonable_encoder(reading, exclude={"id"})
+    document["timestamp"] = _timestamp_value(reading.timestamp)
+    return document
+
 @router.post("/", response_description="Add new climate data", response_model=ClimateDataSchema)
 async def add_climate_data(data: ClimateDataSchema = Body(...)):
     db = get_database()
     climate_collection = db.get_collection("climate_data")
-    data = jsonable_encoder(data)
-    new_data = await climate_collection.insert_one(data)
-    created_data = await climate_collection.find_one({"_id": new_data.inserted_id})
+    data = _to_document(data)
+    with stage("mongo"):
+        new_data = await climate_collection.insert_one(data)
+        created_data = await climate_collection.find_one({"_id": new_data.inserted_id})
+    created_data["_id"] = str(created_data["_id"])
     return created_data
 
-@router.get("/", response_description="List all climate data", response_model=List[ClimateDataSchema])
-async def get_climate_data():
+def _validate_batch(items):
+    """Validates (index, raw) pairs; returns (index, document) pairs and per-item errors."""
+    documents, errors = [], []
+    for index, raw in items:
+        if raw is _INVALID_JSON:
+            errors.append({"index": index, "error": "Invalid JSON"})
+            continue
+        try:
+            reading = ClimateDataSchema.model_validate(raw)
+        except ValidationError as e:
+            errors.append({"index": index, "error": "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            )})
+            continue
+        documents.append((index, _to_document(reading)))
+    return documents, errors
+
+async def _insert_batch(collection, batch_number: int, items):
+    documents, errors = _validate_batch(items)
+    inserted = 0
+    if documents:
+        try:
+            # Unordered: one bad document doesn't stop the rest of the batch
+            with stage("mongo"):
+                result = await collection.insert_many([doc for _, doc in documents], ordered=False)
+            inserted = len(result.inserted_ids)
+        except BulkWriteError as e:
+            inserted = e.details.get("nInserted", 0)
+            for write_error in e.details.get("writeErrors", []):
+                errors.append({"index": documents[write_error["index"]][0], "error": write_error.get("errmsg")})
+    return {"batch": batch_number, "received": len(items), "inserted": inserted, "errors": errors}
+
+async def _ndjson_items(request: Request):
+    """Yields (index, raw line) for each non-empty line of an NDJSON request body as it arrives."""
+    buffer = b""
+    index = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, line
+                index += 1
+    if buffer.strip():
+        yield index, buffer
+
+@router.post("/bulk", response_description="Bulk ingest climate readings")
+async def add_climate_data_bulk(request: Request, chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=10000)):
+    """Accepts a JSON array, or NDJSON (application/x-ndjson) streamed and written batch by batch.
+
+    Nothing is read back after inserting; the response reports per-batch counts
+    and the index of every reading that failed validation or could not be written.
+    """
     db = get_database()
     climate_collection = db.get_collection("climate_data")
-    data = await climate_collection.find().to_list(1000)
-    return data
+    batches = []
+
+    async def flush(items):
+        batches.append(await _insert_batch(climate_collection, len(batches), items))
+
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        pending = []
+        async for index, line in _ndjson_items(request):
+            try:
+                pending.append((index, json.loads(line)))
+            except ValueError:
+                # Keep the position so the error is reported with the right index
+                pending.append((index, _INVALID_JSON))
+            if len(pending) >= chunk_size:
+                await flush(pending)
+                pending = []
+        if pending:
+            await flush(pending)
+    else:
+        try:
+            payload = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array of readings")
+        for start in range(0, len(payload), chunk_size):
+            await flush(list(enumerate(payload[start:start + chunk_size], start=start)))
+
+    inserted = sum(batch["inserted"] for batch in batches)
+    received = sum(batch["received"] for batch in batches)
+    return {"received": received, "inserted": inserted, "failed": received - inserted, "batches": batches}
+
+@router.get("/", response_description="List climate data")
+async def get_climate_data(location: str = None,
+                           start: datetime = Query(None, description="Earliest timestamp (inclusive)"),
+                           end: datetime = Query(None, description="Latest timestamp (inclusive)"),
+                           after: str = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+                           limit: int = Query(1000, ge=1, le=5000),
+                           fields: str = Query(None, description="Comma-separated fields to return")):
+    """Readings ordered by timestamp; the next page's cursor is sent in the X-Next-Cursor header."""
+    db = get_database()
+    climate_collection = db.get_collection("climate_data")
+
+    query = {}
+    if location:
+        query["location"] = location
+    time_range = {}
+    if start:
+        time_range["$gte"] = _timestamp_value(start)
+    if end:
+        time_range["$lte"] = _timestamp_value(end)
+    if time_range:
+        query["timestamp"] = time_range
+
+    try:
+        data, next_cursor = await keyset_page(
+            climate_collection, query, ["timestamp", "_id"], after=after, limit=limit,
+            projection=projection_for(fields),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return FastJSONResponse(data, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
@@ -1,9 +1,8 @@
-from fastapi import APIRouter, Body, HTTPException, status
+from fastapi import APIRouter, Body, HTTPException, Query, Response, status
 from fastapi.encoders import jsonable_encoder
-from typing import List
 
-from app.models import Feedback
-from app.database import get_database
+from app.models import Feedback, FeedbackPage
+from app.database import get_database, keyset_page, projection_for
 
 router = APIRouter()
 
@@ -17,9 +16,24 @@ async def submit_feedback(feedback: Feedback = Body(...)):
     created_feedback = await feedback_collection.find_one({"_id": new_feedback.inserted_id})
     return created_feedback
 
-@router.get("/", response_description="List all feedback", response_model=List[Feedback])
-async def list_feedback():
+@router.get("/", response_description="List feedback", response_model=FeedbackPage, response_model_exclude_unset=True)
+async def list_feedback(response: Response,
+                        after: str = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+                        limit: int = Query(1000, ge=1, le=5000),
+                        fields: str = Query(None, description="Comma-separated fields to return")):
+    """Feedback in submission order; the next page's cursor is in next_cursor and the X-Next-Cursor header."""
+    projection = projection_for(fields)
+    unknown = sorted(set(projection or ()) - set(Feedback.model_fields))
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown fields: {', '.join(unknown)}")
     db = get_database()
     feedback_collection = db.get_collection("feedback")
-    feedbacks = await feedback_collection.find().to_list(1000)
-    return feedbacks
+    try:
+        feedbacks, next_cursor = await keyset_page(
+            feedback_collection, {}, ["_id"], after=after, limit=limit, projection=projection,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return {"items": feedbacks, "next_cursor": next_cursor}
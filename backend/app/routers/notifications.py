@@ -1,33 +1,100 @@
-from fastapi import APIRouter
-from typing import List
+import asyncio
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from app.models import BaseModel
 from pydantic import Field
 from datetime import datetime
 
+from app.services.notification_service import notification_service
+
 router = APIRouter()
 
+# Comment lines sent on idle streams so proxies don't close them
+HEARTBEAT_SECONDS = 15
+
 class Notification(BaseModel):
-    id: int
+    id: str
     title: str
     message: str
     type: str = Field(..., description="info, warning, or danger")
-    timestamp: datetime = Field(default_factory=datetime.now)
+    source: Optional[str] = None
+    timestamp: datetime
     read: bool = False
 
-# Mock database for notifications
-notifications_db = [
-    Notification(id=1, title="High Temperature Alert", message="London temperature exceeded 30°C.", type="danger", timestamp=datetime.now()),
-    Notification(id=2, title="System Update", message="New climate models available.", type="info", timestamp=datetime.now())
-]
+class NotificationCreate(BaseModel):
+    title: str
+    message: str
+    type: str = Field("info", description="info, warning, or danger")
+
+class MarkReadRequest(BaseModel):
+    ids: Optional[List[str]] = Field(None, max_length=5000, description="Notifications to mark; omit to mark every unread one")
+
+@router.get("/", response_description="Get notifications", response_model=List[Notification])
+async def get_notifications(response: Response,
+                            unread: bool = Query(False, description="Only unread notifications"),
+                            after: str = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+                            limit: int = Query(50, ge=1, le=500)):
+    """Newest first; the next page's cursor is sent in the X-Next-Cursor header."""
+    try:
+        notifications, next_cursor = await notification_service.list_page(after=after, limit=limit, unread=unread)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return notifications
 
-@router.get("/", response_description="Get all notifications", response_model=List[Notification])
-async def get_notifications():
-    return notifications_db
+@router.post("/", response_description="Create and broadcast a notification", response_model=Notification,
+             status_code=status.HTTP_201_CREATED)
+async def create_notification(notification: NotificationCreate = Body(...)):
+    return await notification_service.create(notification.title, notification.message,
+                                             type=notification.type, source="broadcast")
+
+@router.get("/unread-count", response_description="Number of unread notifications")
+async def get_unread_count():
+    return {"unread": await notification_service.unread_count()}
+
+@router.post("/read", response_description="Mark several notifications as read")
+async def mark_many_read(request: MarkReadRequest = Body(MarkReadRequest())):
+    try:
+        modified = await notification_service.mark_read(request.ids)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"marked_read": modified}
 
 @router.post("/{id}/read", response_description="Mark notification as read")
-async def mark_read(id: int):
-    for note in notifications_db:
-        if note.id == id:
-            note.read = True
-            return {"message": "Marked as read"}
-    return {"error": "Notification not found"}
+async def mark_read(id: str):
+    try:
+        modified = await notification_service.mark_read([id])
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not modified:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found or already read")
+    return {"message": "Marked as read"}
+
+@router.get("/stream", response_description="Server-sent events for new notifications")
+async def stream_notifications(request: Request):
+    """Pushes each new notification as an SSE `notification` event."""
+    queue = notification_service.hub.subscribe()
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: notification\ndata: {payload}\n\n"
+        finally:
+            notification_service.hub.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/stream/stats", response_description="Live subscriber counts")
+async def stream_stats():
+    return notification_service.hub.stats()
@@ -1,12 +1,90 @@
-from fastapi import APIRouter, HTTPException
-from app.models import PredictionRequest
-from app.services.ml_service import ml_service
+import json
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from app.models import PredictionRequest, BatchPredictionRequest, ModelPredictionRequest, TrainingRequest
+from app.services.ml_service import ml_service, predict_weather as fetch_prediction, predict_many
+from app.services.inference_service import inference_service, ModelUnavailableError, IncompatibleModelError
+from app.services.training_jobs import training_jobs, TrainingJobRunning, TRAINING_N_JOBS
+from app.services.weather_cache import weather_cache
+from app.services.serialization import FastJSONResponse
 
 router = APIRouter()
 
 @router.post("/", response_description="Predict Weather Trend")
 async def predict_weather(request: PredictionRequest):
-    result = ml_service.predict_weather(request.city, request.country)
+    result = await fetch_prediction(request.city, request.country)
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
+
+def _batch_item(index: int, item: PredictionRequest, result: dict):
+    entry = {"index": index, "city": item.city, "country": item.country}
+    if "error" in result:
+        entry["error"] = result["error"]
+    else:
+        entry["result"] = result
+    return entry
+
+@router.post("/batch", response_description="Predict Weather Trends for Many Cities")
+async def predict_weather_batch(request: BatchPredictionRequest, stream: bool = False):
+    locations = [(item.city, item.country) for item in request.items]
+    results = predict_many(locations, concurrency=request.concurrency)
+
+    if stream:
+        # NDJSON, one line per item in completion order
+        async def lines():
+            async for index, result in results:
+                yield json.dumps(_batch_item(index, request.items[index], result), default=str) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    items = [None] * len(locations)
+    async for index, result in results:
+        items[index] = _batch_item(index, request.items[index], result)
+    failed = sum(1 for item in items if "error" in item)
+    return FastJSONResponse({"results": items, "succeeded": len(items) - failed, "failed": failed})
+
+@router.post("/model", response_description="Predict Temperature with the Trained Model")
+async def predict_with_model(request: ModelPredictionRequest):
+    try:
+        if request.rows:
+            return await inference_service.predict_rows([row.model_dump() for row in request.rows])
+        return await inference_service.predict_dataset(
+            request.city, country=request.country, start_date=request.start_date, end_date=request.end_date
+        )
+    except ModelUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except IncompatibleModelError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/model/stats", response_description="Model Inference Batching Statistics")
+async def get_inference_stats():
+    return inference_service.batcher.stats()
+
+@router.post("/train", status_code=status.HTTP_202_ACCEPTED, response_description="Start a Model Training Job")
+async def start_training(request: TrainingRequest = TrainingRequest()):
+    try:
+        return training_jobs.submit(
+            n_estimators=request.n_estimators,
+            n_jobs=request.n_jobs if request.n_jobs is not None else TRAINING_N_JOBS,
+        )
+    except TrainingJobRunning as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+@router.get("/train", response_description="List Model Training Jobs")
+async def list_training_jobs():
+    # Not loading the model service just to report that nothing has been trained yet
+    version = ml_service.model_version if ml_service.loaded else None
+    return {"jobs": training_jobs.list(), "serving_model_version": version}
+
+@router.get("/train/{job_id}", response_description="Get Model Training Job Status")
+async def get_training_job(job_id: str):
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job
+
+@router.get("/cache", response_description="Weather Cache Statistics")
+async def get_weather_cache_stats():
+    return weather_cache.stats()
@@ -1,29 +1,75 @@
-from fastapi import APIRouter
-import pandas as pd
-import os
+import asyncio
+from typing import Literal
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-router = APIRouter()
+from app.services.analytics_service import analytics_service
+from app.services.lazy import readiness
+from app.services.dataset_registry import dataset_registry
+from app.services.metrics import registry as metrics_registry
+from app.services.profiling import profile_store, token_valid, PROFILING_TOKEN
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-DATA_PATH = os.path.join(BASE_DIR, "data", "global_climate_data.csv")
+router = APIRouter()
 
 @router.get("/stats")
 async def get_system_stats():
+    """Served from the dataset registry's precomputed summaries; nothing is read from disk."""
     stats = {
         "status": "operational",
         "dataset_rows": 0,
         "cities_tracked": [],
         "last_updated": "2025-12-30"
     }
-    
-    if os.path.exists(DATA_PATH):
-        try:
-            df = pd.read_csv(DATA_PATH)
-            stats["dataset_rows"] = len(df)
-            stats["cities_tracked"] = df['city'].unique().tolist() if 'city' in df.columns else []
-            if 'date' in df.columns:
-                stats["last_updated"] = df['date'].max()
-        except Exception as e:
-            stats["error"] = str(e)
-            
+
+    # The first call reads the dataset file
+    dataset = await asyncio.to_thread(dataset_registry.get, "climate")
+    if dataset is not None:
+        stats["dataset_rows"] = dataset.summary["rows"]
+        stats["cities_tracked"] = dataset.summary.get("cities", [])
+        stats["last_updated"] = dataset.summary.get("date_max") or stats["last_updated"]
+        stats["dataset_version"] = dataset.version
+
+    stats["datasets"] = dataset_registry.describe()
+    # Reported once the service has loaded; a stats request shouldn't build it
+    stats["analytics_store"] = analytics_service.memory_usage() if analytics_service.loaded else None
     return stats
+
+@router.get("/ready")
+async def get_readiness():
+    """200 once every service has loaded; 503 (with per-service status) until then."""
+    report = readiness()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Request and stage metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _check_profiling_token(token: str | None):
+    if not PROFILING_TOKEN:
+        raise HTTPException(status_code=404, detail="Profiling is not enabled (set PROFILING_TOKEN)")
+    if not token_valid(token):
+        raise HTTPException(status_code=403, detail="A valid X-Profile-Token header is required")
+
+@router.get("/profiles")
+async def list_profiles(x_profile_token: str = Header(None)):
+    """The most recent request profiles, newest first."""
+    _check_profiling_token(x_profile_token)
+    return {"profiles": profile_store.list()}
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_profile_token: str = Header(None),
+                      format: Literal["collapsed", "pstats", "prof"] = Query("collapsed"),
+                      sort: Literal["cumulative", "tottime", "ncalls"] = Query("cumulative"),
+                      limit: int = Query(50, ge=1, le=1000)):
+    """One profile as folded stacks for flame graphs, a pstats report, or a .prof file."""
+    _check_profiling_token(x_profile_token)
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "prof":
+        return Response(profile.pstats_dump(), media_type="application/octet-stream",
+                        headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'})
+    if format == "pstats":
+        return PlainTextResponse(profile.pstats_text(sort=sort, limit=limit))
+    return PlainTextResponse(profile.collapsed())
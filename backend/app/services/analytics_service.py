@@ -1,84 +1,148 @@
-import os
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import io
 import base64
+import hashlib
+import json
 import logging
 
+from app.services.climate_store import PARTITION_COLUMNS
+from app.services.downsampling import downsample_frame, downsample_indices, x_values
+from app.services.serialization import frame_to_records
+from app.services.rollup_service import RollupEngine
+from app.services.correlation_engine import CorrelationEngine
+from app.services.anomaly_service import AnomalyEngine
+from app.services.notification_service import notification_service
+from app.services.lazy import LazyService
+from app.services.dataset_registry import dataset_registry
+from app.services.metrics import stage
+
 logger = logging.getLogger(__name__)
 
-# Paths
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-DATA_PATH = os.path.join(BASE_DIR, "data", "climate_data.csv")
+DATASET = "climate"
 
 class AnalyticsService:
-    def __init__(self):
-        self.data = self._load_data()
-
-    def _load_data(self):
-        # Update path to global data
-        data_path = os.path.join(BASE_DIR, "data", "global_climate_data.csv")
-        if os.path.exists(data_path):
-            return pd.read_csv(data_path)
-        # Fallback to old if new not found
-        old_path = os.path.join(BASE_DIR, "data", "climate_data.csv")
-        if os.path.exists(old_path):
-            return pd.read_csv(old_path)
-        return None
+    def __init__(self, preload: bool = True):
+        # A columnar dataset is never loaded whole: every query is pushed down to the
+        # memory-mapped files, and preload builds rollups and correlation statistics
+        # one partition at a time. Without preload, a CSV dataset gets only the
+        # filtering store and neither gets rollups or correlations (render workers use this)
+        self.preload = preload
+        self.anomalies = AnomalyEngine()
+        self._apply(dataset_registry.get(DATASET))
+        # Derived structures are rebuilt whenever the registry swaps in a new file version
+        dataset_registry.subscribe(DATASET, self._apply)
+
+    def _apply(self, dataset):
+        if dataset is not None and dataset.source is not None:
+            rollups, correlations = self._build_from_partitions(dataset) if self.preload else (None, None)
+            self.dataset = dataset
+            self.data_version, self.store, self.data, self.rollups, self.correlations = (
+                dataset.version, None, None, rollups, correlations
+            )
+            return
+        # The registry's store, shared with every other consumer of this dataset version
+        store = dataset.store if dataset is not None else None
+        data = store.frame if store is not None else None
+        # Rollups and correlation statistics serve the API process only; render
+        # workers filter the store and compute what a chart needs on the fly
+        rollups = RollupEngine(data) if data is not None and self.preload else None
+        correlations = CorrelationEngine(data) if data is not None and self.preload else None
+        # Everything is built before any of it is published
+        self.dataset = dataset
+        self.data_version, self.store, self.data, self.rollups, self.correlations = (
+            dataset.version if dataset is not None else None, store, data, rollups, correlations
+        )
+
+    @staticmethod
+    def _build_from_partitions(dataset):
+        """Rollups and correlation statistics of a columnar dataset, in one pass over its partitions."""
+        correlations = None
+
+        def partitions():
+            nonlocal correlations
+            for frame in dataset.source.iter_partitions():
+                if correlations is None:
+                    correlations = CorrelationEngine(frame)
+                else:
+                    correlations.append(frame)
+                yield frame
+
+        rollups = RollupEngine.from_partitions(partitions())
+        return rollups, correlations
+
+    def refresh(self) -> bool:
+        """Picks up a changed dataset file now rather than at the next poll."""
+        return dataset_registry.check(DATASET)
 
     def _filter_data(self, city: str = None, country: str = None, start_date: str = None, end_date: str = None):
-        if self.data is None:
-            return None
-        
-        df = self.data.copy()
-        
-        # Ensure date column is datetime
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
-
-        # Apply Filters
-        if country:
-            df = df[df['country'] == country]
-        if city:
-            df = df[df['city'] == city]
-        
-        if start_date:
-            df = df[df['date'] >= pd.to_datetime(start_date)]
-        if end_date:
-            df = df[df['date'] <= pd.to_datetime(end_date)]
-            
-        return df
-
-    def _plot_to_base64(self):
+        with stage("dataset_filter"):
+            if self.store is None:
+                if self.dataset is not None and self.dataset.source is not None:
+                    return self.dataset.scan(city=city, country=country, start_date=start_date, end_date=end_date)
+                return None
+
+            # Dates are already parsed and rows indexed by the store; the result is
+            # a view where possible, so callers must not modify it in place.
+            return self.store.query(city=city, country=country, start_date=start_date, end_date=end_date)
+
+    def query(self, city: str = None, country: str = None, start_date: str = None, end_date: str = None):
+        """Rows matching the filters, without default location or downsampling; None without data.
+
+        The result may be a view of the store and must not be modified.
+        """
+        return self._filter_data(city=city, country=country, start_date=start_date, end_date=end_date)
+
+    def memory_usage(self):
+        if self.store is None:
+            return {"rows": 0, "partitions": 0, "total_bytes": 0, "columns": {}}
+        return self.store.memory_usage()
+
+    def _plot_to_base64(self, fig):
+        # Figures are built with the object-oriented API rather than pyplot, so
+        # rendering shares no global state and nothing needs closing afterwards
         img = io.BytesIO()
-        plt.savefig(img, format='png', bbox_inches='tight')
+        fig.savefig(img, format='png', bbox_inches='tight')
         img.seek(0)
         return base64.b64encode(img.getvalue()).decode()
 
-    def generate_correlation_matrix(self, city: str = None, country: str = None):
-        # Filter data based on provided city/country
-        df = self._filter_data(city=city, country=country)
-        
-        if df is None or df.empty:
+    def get_correlation(self, city: str = None, country: str = None):
+        """Correlation matrix of the numeric variables, merged from per-city statistics."""
+        if self.correlations is None:
+            df = self._filter_data(city=city, country=country)
+            return CorrelationEngine(df).matrix() if df is not None and not df.empty else None
+        if not self.correlations.variables:
             return None
+        return self.correlations.matrix(city=city, country=country)
 
-        plt.figure(figsize=(10, 8))
-        # Filter only numeric columns
-        numeric_data = df.select_dtypes(include=['number'])
-        if numeric_data.empty:
+    def generate_correlation_matrix(self, city: str = None, country: str = None):
+        corr = self.get_correlation(city=city, country=country)
+        if corr is None:
             return None
-            
-        corr = numeric_data.corr()
-        
-        sns.heatmap(corr, annot=True, cmap='coolwarm', linewidths=0.5)
-        plt.title(f'Correlation Matrix - {city or country or "Global"}')
+
+        # Plotting libraries are imported on first render to keep startup fast
+        import seaborn as sns
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(10, 8))
+        ax = fig.add_subplot()
+        sns.heatmap(corr, annot=True, cmap='coolwarm', linewidths=0.5, ax=ax)
+        ax.set_title(f'Correlation Matrix - {city or country or "Global"}')
         
-        img_base64 = self._plot_to_base64()
-        plt.close()
-        return img_base64
+        return self._plot_to_base64(fig)
 
-    def generate_variable_comparison(self, variables: list[str], city: str = "Karachi", country: str = None):
+    def _downsample(self, df, max_points: int, method: str):
+        """Downsamples each (country, city) series in the frame to max_points rows."""
+        if not max_points or len(df) <= max_points:
+            return df
+        if not all(col in df.columns for col in PARTITION_COLUMNS):
+            return downsample_frame(df, max_points, method)
+        groups = df.groupby(PARTITION_COLUMNS, observed=True, sort=False)
+        if groups.ngroups == 1:
+            return downsample_frame(df, max_points, method)
+        return pd.concat([downsample_frame(group, max_points, method) for _, group in groups])
+
+    def generate_variable_comparison(self, variables: list[str], city: str = "Karachi", country: str = None,
+                                     max_points: int = None, method: str = "lttb"):
         df = self._filter_data(city=city, country=country)
         
         if df is None or df.empty:
@@ -87,46 +151,141 @@ class AnalyticsService:
         x_axis = df['date'] if 'date' in df.columns else df.index
         x_label = 'Date' if 'date' in df.columns else 'Index'
 
-        fig, ax = plt.subplots(figsize=(10, 6))
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(10, 6))
+        ax = fig.add_subplot()
         
         for var in variables:
             if var in df.columns:
-                ax.plot(x_axis, df[var], label=var)
+                if max_points and len(df) > max_points:
+                    # Each line keeps its own peaks; a plot can't show more points than this anyway
+                    keep = downsample_indices(x_values(x_axis), df[var].to_numpy(), max_points, method)
+                    ax.plot(x_axis.iloc[keep] if hasattr(x_axis, 'iloc') else x_axis[keep], df[var].iloc[keep], label=var)
+                else:
+                    ax.plot(x_axis, df[var], label=var)
         
         ax.set_xlabel(x_label)
         ax.set_ylabel('Values')
         ax.legend()
-        plt.title(f"Comparison: {', '.join(variables)} ({city or country})")
+        ax.set_title(f"Comparison: {', '.join(variables)} ({city or country})")
 
-        img_base64 = self._plot_to_base64()
-        plt.close()
-        return img_base64
+        return self._plot_to_base64(fig)
 
-    def get_all_data(self, city: str = None, country: str = None, start_date: str = None, end_date: str = None):
-        """Returns the dataset as a list of dictionaries for frontend charts."""
+    @staticmethod
+    def _default_location(city: str = None, country: str = None):
         # Validate that if no filters are provided, we default to something reasonable or return all?
         # User asked for default Karachi.
         target_city = city if city else ("Karachi" if not country else None)
         target_country = country if country else ("Pakistan" if not city else None)
-        
-        # If user explicitly sent empty string or None, we might fallback. 
+
+        # If user explicitly sent empty string or None, we might fallback.
         # But let's stick to the requested default: Karachi, PK if nothing provided.
-        if not city and not country: 
+        if not city and not country:
             target_city = "Karachi"
             target_country = "Pakistan"
+        return target_city, target_country
+
+    def get_data_frame(self, city: str = None, country: str = None, start_date: str = None, end_date: str = None,
+                       max_points: int = None, method: str = "lttb"):
+        """Filtered (and optionally downsampled) frame behind /analytics/data.
 
+        With max_points set, each city's series is downsampled to at most that many rows.
+        The result may be a view of the store and must not be modified.
+        """
+        target_city, target_country = self._default_location(city, country)
         df = self._filter_data(city=target_city, country=target_country, start_date=start_date, end_date=end_date)
         
         if df is None or df.empty:
+            return None
+
+        return self._downsample(df, max_points, method)
+
+    def get_all_data(self, city: str = None, country: str = None, start_date: str = None, end_date: str = None,
+                     max_points: int = None, method: str = "lttb"):
+        """Returns the dataset as a list of dictionaries for frontend charts."""
+        df = self.get_data_frame(city, country, start_date, end_date, max_points, method)
+        if df is None:
             return []
-        
-        # Ensure date format is string (ISO) for JSON serialization
-        if 'date' in df.columns:
-            df['date'] = df['date'].dt.strftime('%Y-%m-%d')
-        
-        # Fill NaNs to avoid JSON errors
-        df = df.fillna(0)
-        
-        return df.to_dict(orient='records')
+        return frame_to_records(df)
+
+    def get_aggregates(self, grain: str, aggs: list[str], variables: list[str] = None, city: str = None,
+                       country: str = None, start_date: str = None, end_date: str = None, window: int = None):
+        """Pre-aggregated series per city; all numeric variables if none are given."""
+        if self.rollups is None:
+            return []
+        result = self.rollups.query(grain, aggs, variables or self.rollups.variables, city=city, country=country,
+                                    start_date=start_date, end_date=end_date, window=window)
+        return self.rollups.to_series(result)
+
+    def get_anomalies(self, city: str = None, country: str = None, start_date: str = None, end_date: str = None,
+                      threshold: float = 0.0, limit: int = 500):
+        """Anomalous readings with their scores and contributing variables."""
+        if self.data is not None:
+            self.anomalies.refresh(self.data, self.data_version)
+        elif self.dataset is not None and self.dataset.source is not None:
+            # Fitted one partition at a time rather than on the whole table
+            self.anomalies.refresh(self.dataset.source.iter_partitions(), self.data_version)
+        else:
+            return {"anomalies": [], "count": 0, "rows_scored": 0}
+
+        df = self._filter_data(city=city, country=country, start_date=start_date, end_date=end_date)
+        # Scanned rows aren't indexed like the rows the detectors were fitted on
+        anomalies, scored = self.anomalies.detect(df, self.data_version, threshold=threshold,
+                                                  reuse_scores=self.store is not None)
+        notification_service.alert_anomalies(anomalies)
+        return {
+            "anomalies": anomalies[:limit],
+            "count": len(anomalies),
+            "rows_scored": scored,
+            "dataset_version": self.anomalies.version,
+            "refitting": self.anomalies.refitting,
+        }
+
+    def _cursor_scope(self, filters: dict) -> str:
+        payload = json.dumps({"v": self.data_version, "f": filters}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def get_data_page(self, cursor: str = None, limit: int = 1000, **filters):
+        """One page of /analytics/data plus an opaque cursor for the next page.
+
+        Cursors are bound to the filters and dataset version they were issued
+        for; a cursor that doesn't match raises ValueError.
+        """
+        scope = self._cursor_scope(filters)
+        offset = 0
+        if cursor:
+            try:
+                state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+                offset = int(state["o"])
+            except (ValueError, KeyError, TypeError):
+                raise ValueError("Malformed cursor")
+            if state.get("s") != scope or offset < 0:
+                raise ValueError("Cursor does not match these filters or the dataset has changed")
+
+        ranges = None
+        if self.store is not None and not filters.get("max_points"):
+            city, country = self._default_location(filters.get("city"), filters.get("country"))
+            ranges = self.store.row_ranges(city=city, country=country, start_date=filters.get("start_date"),
+                                           end_date=filters.get("end_date"))
+        if ranges is not None:
+            # Only the page's rows are read: the cursor offset is resolved against the store's row ranges
+            total = sum(hi - lo for lo, hi in ranges)
+            if total == 0:
+                return None, None
+            page = self.store.window(ranges, offset, limit)
+        else:
+            # Downsampled series depend on every row, and columnar scans are already pushed down
+            df = self.get_data_frame(**filters)
+            if df is None:
+                return None, None
+            total = len(df)
+            page = df.iloc[offset:offset + limit]
+
+        next_cursor = None
+        if offset + limit < total:
+            state = json.dumps({"o": offset + limit, "s": scope}).encode()
+            next_cursor = base64.urlsafe_b64encode(state).decode()
+        return page, next_cursor
 
-analytics_service = AnalyticsService()
+analytics_service = LazyService("analytics_service", AnalyticsService)
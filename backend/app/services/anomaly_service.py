@@ -0,0 +1,183 @@
+import os
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.climate_store import PARTITION_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+ANOMALY_FEATURES = ['temperature', 'humidity', 'co2_levels', 'wind_speed', 'rainfall', 'pressure']
+ANOMALY_FIT_WORKERS = int(os.getenv("ANOMALY_FIT_WORKERS", str(min(8, os.cpu_count() or 1))))
+# A variable "contributes" to an anomaly when it is this many standard deviations from the city's mean
+CONTRIBUTION_Z = 2.0
+
+
+class CityDetector:
+    """IsolationForest fitted on one city, with the statistics used to explain its scores."""
+
+    def __init__(self, features: list[str], frame: pd.DataFrame):
+        from sklearn.ensemble import IsolationForest
+
+        self.features = features
+        values = frame[features]
+        self.medians = values.median()
+        self.means = values.mean().to_numpy()
+        self.stds = values.std().replace(0, np.nan).to_numpy()
+        self.model = IsolationForest(contamination=0.05, random_state=42)
+        self.model.fit(self._matrix(frame))
+        # Scores of the training rows, kept so filtered queries never rescore
+        self.scores = pd.Series(self.model.decision_function(self._matrix(frame)), index=frame.index)
+
+    def _matrix(self, frame: pd.DataFrame) -> np.ndarray:
+        # IsolationForest can't take NaN; missing readings count as typical
+        return frame[self.features].fillna(self.medians).to_numpy(dtype=np.float64)
+
+    def score(self, frame: pd.DataFrame) -> np.ndarray:
+        """decision_function for rows the detector was not fitted on; negative means anomalous."""
+        return self.model.decision_function(self._matrix(frame))
+
+    def contributors(self, frame: pd.DataFrame) -> list[list[dict]]:
+        with np.errstate(invalid='ignore'):
+            z = (frame[self.features].to_numpy(dtype=np.float64) - self.means) / self.stds
+        # Constant or missing variables can't explain anything
+        z = np.nan_to_num(z, nan=0.0, posinf=0.0, neginf=0.0)
+        result = []
+        for row in z:
+            order = np.argsort(-np.abs(row))
+            picked = [i for i in order if abs(row[i]) >= CONTRIBUTION_Z] or list(order[:1])
+            result.append([{"variable": self.features[i], "z_score": round(float(row[i]), 2)} for i in picked])
+        return result
+
+
+class AnomalyEngine:
+    """Per-(country, city) anomaly detectors cached under the dataset version.
+
+    Detectors are fitted once, in parallel across cities. When the dataset
+    version changes they are refitted on a background thread while the previous
+    detectors keep serving requests.
+    """
+
+    def __init__(self):
+        self.version = None
+        self._detectors = {}
+        self._lock = threading.Lock()
+        self._refitting = None
+
+    @property
+    def refitting(self) -> bool:
+        return self._refitting is not None
+
+    @staticmethod
+    def _groups(frames):
+        for frame in [frames] if isinstance(frames, pd.DataFrame) else frames:
+            if all(col in frame.columns for col in PARTITION_COLUMNS):
+                yield from frame.groupby(PARTITION_COLUMNS, observed=True, sort=False)
+            else:
+                yield (None, None), frame
+
+    def _fit_all(self, frames) -> dict:
+        """Fits a detector per city of `frames`: one frame, or an iterable of per-partition frames."""
+        detectors = {}
+        fitting = deque()
+        with ThreadPoolExecutor(max_workers=ANOMALY_FIT_WORKERS, thread_name_prefix="anomaly-fit") as pool:
+            for key, group in self._groups(frames):
+                features = [f for f in ANOMALY_FEATURES if f in group.columns]
+                if not features or group.empty:
+                    continue
+                fitting.append((key, pool.submit(CityDetector, features, group)))
+                # Bounds how many partitions a partition-at-a-time source keeps in memory
+                if len(fitting) >= 2 * ANOMALY_FIT_WORKERS:
+                    key, future = fitting.popleft()
+                    detectors[key] = future.result()
+            for key, future in fitting:
+                detectors[key] = future.result()
+        return detectors
+
+    def _refit(self, frames, version: str):
+        try:
+            detectors = self._fit_all(frames)
+            with self._lock:
+                self._detectors, self.version = detectors, version
+            logger.info("Fitted anomaly detectors for %s cities (dataset %s)", len(detectors), version)
+        except Exception as e:
+            logger.error("Anomaly detector refit failed: %s", e)
+        finally:
+            self._refitting = None
+
+    def refresh(self, frames, version: str):
+        """Makes sure detectors match `version`.
+
+        `frames` is the dataset as one frame or as an iterable of per-partition
+        frames. The first fit happens inline; later version changes refit in
+        the background.
+        """
+        if version == self.version:
+            return
+        if not self._detectors:
+            with self._lock:
+                if self.version != version:
+                    self._detectors, self.version = self._fit_all(frames), version
+            return
+        with self._lock:
+            if self._refitting is not None:
+                return
+            self._refitting = threading.Thread(target=self._refit, args=(frames, version),
+                                               name="anomaly-refit", daemon=True)
+            self._refitting.start()
+
+    def detect(self, rows: pd.DataFrame, version: str, threshold: float = 0.0,
+               reuse_scores: bool = True) -> tuple[list[dict], int]:
+        """Anomalous rows among `rows`, most anomalous first.
+
+        Rows from the frame the detectors were fitted on (same `version`) reuse the
+        scores computed at fit time; other rows are scored without refitting.
+        Pass reuse_scores=False when `rows` isn't indexed like that frame, e.g.
+        rows scanned from a columnar dataset.
+        A row is anomalous when its score is below `threshold`; 0 matches the
+        detectors' 5% contamination cut-off, lower values are stricter.
+        """
+        with self._lock:
+            detectors, fitted_version = self._detectors, self.version
+        if rows.empty or not detectors:
+            return [], 0
+
+        if all(col in rows.columns for col in PARTITION_COLUMNS):
+            groups = rows.groupby(PARTITION_COLUMNS, observed=True, sort=False)
+        else:
+            groups = [((None, None), rows)]
+
+        anomalies = []
+        scored = 0
+        for key, group in groups:
+            detector = detectors.get(key)
+            if detector is None:
+                continue
+            if reuse_scores and version == fitted_version:
+                scores = detector.scores.reindex(group.index)
+                unseen = scores.isna().to_numpy()
+                if unseen.any():
+                    scores[unseen] = detector.score(group[unseen])
+            else:
+                scores = pd.Series(detector.score(group), index=group.index)
+            scored += len(group)
+
+            flagged = group[(scores < threshold).to_numpy()]
+            if flagged.empty:
+                continue
+            flagged_scores = scores[(scores < threshold).to_numpy()].tolist()
+            dates = flagged['date'].dt.strftime('%Y-%m-%d').tolist() if 'date' in flagged.columns else [None] * len(flagged)
+            for date, score, contributors in zip(dates, flagged_scores, detector.contributors(flagged)):
+                anomalies.append({
+                    "date": date,
+                    "country": key[0],
+                    "city": key[1],
+                    "score": round(score, 4),
+                    "contributors": contributors,
+                })
+
+        anomalies.sort(key=lambda item: item["score"])
+        return anomalies, scored
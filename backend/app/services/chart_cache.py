@@ -0,0 +1,118 @@
+import os
+import json
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Optional on-disk tier; disabled unless a directory is configured
+CACHE_DIR = os.getenv("CHART_CACHE_DIR")
+
+
+def make_chart_key(chart: str, dataset_version: str, **params) -> str:
+    """Content address for a rendered chart: the same inputs always map to the same key."""
+    payload = json.dumps(
+        {"chart": chart, "dataset": dataset_version, "params": params},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ChartCache:
+    """Rendered chart cache (base64 PNG strings) with a memory cap and LRU eviction.
+
+    When `cache_dir` is set, entries are also written to disk so they survive
+    restarts and are shared between workers; disk hits are promoted to memory.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES, cache_dir: str = CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries: OrderedDict = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.b64")
+
+    def _remember(self, key: str, value: str):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = value
+        self._size += size
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.cache_dir:
+            try:
+                with open(self._disk_path(key), "r") as f:
+                    value = f.read()
+            except OSError:
+                value = None
+            if value:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, value)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._remember(key, value)
+
+        if self.cache_dir:
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    f.write(value)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning("Could not write chart cache entry to disk: %s", e)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "disk_dir": self.cache_dir,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+chart_cache = ChartCache()
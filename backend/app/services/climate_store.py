@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+PARTITION_COLUMNS = ["country", "city"]
+
+
+class ClimateStore:
+    """In-memory climate dataset partitioned by (country, city) and sorted by date.
+
+    Dates are parsed once at load time and city/country are stored as categoricals.
+    Each partition occupies a contiguous row range of a single frame, so a city
+    lookup plus a date range is two binary searches and a positional slice.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.frame = self._prepare(df)
+        self._dates = self.frame['date'].to_numpy() if 'date' in self.frame.columns else None
+        self._partitions = self._build_partitions()
+        # Partition keys per country and per city, in row order, for single-key lookups
+        self._by_country, self._by_city = {}, {}
+        for key in self._partitions:
+            self._by_country.setdefault(key[0], []).append(key)
+            self._by_city.setdefault(key[1], []).append(key)
+
+    def _prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        if 'date' in df.columns:
+            df['date'] = pd.to_datetime(df['date'])
+        for col in PARTITION_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+                # Categorical input (e.g. Parquet) keeps its categories in whatever order
+                # they were written; categoricals sort by that order, so make it lexical
+                df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+
+        sort_cols = [c for c in PARTITION_COLUMNS + ['date'] if c in df.columns]
+        if sort_cols:
+            df = df.sort_values(sort_cols, kind='mergesort')
+        return df.reset_index(drop=True)
+
+    def _build_partitions(self):
+        """Maps (country, city) -> (start, stop) row offsets into self.frame."""
+        if not all(col in self.frame.columns for col in PARTITION_COLUMNS) or self.frame.empty:
+            return {}
+
+        countries = self.frame['country'].to_numpy()
+        cities = self.frame['city'].to_numpy()
+        # Rows are sorted by (country, city), so a partition ends wherever either key changes
+        changed = (countries[1:] != countries[:-1]) | (cities[1:] != cities[:-1])
+        bounds = np.concatenate(([0], np.flatnonzero(changed) + 1, [len(self.frame)]))
+
+        partitions = {}
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            partitions[(countries[start], cities[start])] = (int(start), int(stop))
+        return partitions
+
+    @property
+    def partitions(self):
+        return list(self._partitions.keys())
+
+    def _date_bounds(self, start: int, stop: int, start_date, end_date):
+        if self._dates is None:
+            return start, stop
+        dates = self._dates[start:stop]
+        lo = start
+        hi = stop
+        if start_date:
+            lo = start + int(np.searchsorted(dates, pd.Timestamp(start_date).to_datetime64(), side='left'))
+        if end_date:
+            hi = start + int(np.searchsorted(dates, pd.Timestamp(end_date).to_datetime64(), side='right'))
+        return lo, max(lo, hi)
+
+    def row_ranges(self, city: str = None, country: str = None, start_date: str = None, end_date: str = None):
+        """Sorted, non-empty (start, stop) row ranges matching the filters; None without partitions."""
+        if not self._partitions:
+            return None
+
+        if country and city:
+            keys = [(country, city)] if (country, city) in self._partitions else []
+        elif country:
+            keys = self._by_country.get(country, [])
+        elif city:
+            keys = self._by_city.get(city, [])
+        else:
+            keys = self._partitions
+        ranges = [self._date_bounds(*self._partitions[key], start_date, end_date) for key in keys]
+        ranges = [(lo, hi) for lo, hi in ranges if hi > lo]
+        if not ranges:
+            return []
+
+        # Merge adjacent ranges so e.g. a whole country without dates stays a single slice
+        merged = [ranges[0]]
+        for lo, hi in ranges[1:]:
+            if lo == merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+            else:
+                merged.append((lo, hi))
+        return merged
+
+    def _rows(self, ranges) -> pd.DataFrame:
+        if not ranges:
+            return self.frame.iloc[0:0]
+        if len(ranges) == 1:
+            lo, hi = ranges[0]
+            return self.frame.iloc[lo:hi]
+        positions = np.concatenate([np.arange(lo, hi) for lo, hi in ranges])
+        return self.frame.iloc[positions]
+
+    def query(self, city: str = None, country: str = None, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+        """Returns rows matching the filters; empty/None filters match everything.
+
+        A single matching partition (or a contiguous run of them without a date
+        filter) is returned as a positional slice of the underlying frame.
+        """
+        ranges = self.row_ranges(city, country, start_date, end_date)
+        if ranges is None:
+            return self._query_unpartitioned(city, country, start_date, end_date)
+        return self._rows(ranges)
+
+    def window(self, ranges, offset: int, limit: int) -> pd.DataFrame:
+        """Rows offset .. offset + limit of the rows covered by `ranges`, reading only those rows."""
+        picked = []
+        for lo, hi in ranges:
+            if offset >= hi - lo:
+                offset -= hi - lo
+                continue
+            start = lo + offset
+            stop = min(hi, start + limit)
+            picked.append((start, stop))
+            offset = 0
+            limit -= stop - start
+            if limit <= 0:
+                break
+        return self._rows(picked)
+
+    def _query_unpartitioned(self, city, country, start_date, end_date):
+        # Fallback for datasets without city/country columns (e.g. legacy climate_data.csv)
+        df = self.frame
+        if country:
+            df = df[df['country'] == country] if 'country' in df.columns else df.iloc[0:0]
+        if city:
+            df = df[df['city'] == city] if 'city' in df.columns else df.iloc[0:0]
+        # Rows are sorted by date only within a country or city here, so a mask rather than a binary search
+        if self._dates is not None and start_date:
+            df = df[df['date'] >= pd.Timestamp(start_date)]
+        if self._dates is not None and end_date:
+            df = df[df['date'] <= pd.Timestamp(end_date)]
+        return df
+
+    def memory_usage(self) -> dict:
+        """Approximate memory footprint of the store in bytes."""
+        columns = self.frame.memory_usage(deep=True, index=False)
+        return {
+            "rows": len(self.frame),
+            "partitions": len(self._partitions),
+            "total_bytes": int(columns.sum()),
+            "columns": {col: int(size) for col, size in columns.items()},
+        }
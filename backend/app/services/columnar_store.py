@@ -0,0 +1,175 @@
+import os
+import json
+import shutil
+import logging
+from datetime import datetime, timezone
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pa_fs
+    import pyarrow.parquet as pq
+    HAVE_ARROW = True
+except ImportError:  # CSV remains the storage format without pyarrow
+    HAVE_ARROW = False
+
+from app.services.climate_store import PARTITION_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+# Versions of a converted dataset kept on disk; older ones may still be mapped by running processes
+KEEP_VERSIONS = 2
+
+
+def _dictionary_encode(table, skip: list[str]):
+    """Dictionary-encodes the string columns that aren't stored as partition directories."""
+    for i, field in enumerate(table.schema):
+        if field.name not in skip and pa.types.is_string(field.type):
+            table = table.set_column(i, field.name, table.column(i).dictionary_encode())
+    return table
+
+
+def _read_table(path: str):
+    if path.endswith(".parquet"):
+        table = pq.read_table(path)
+        # Partition values become directory names, so they are written from plain strings
+        for i, field in enumerate(table.schema):
+            if field.name in PARTITION_COLUMNS and pa.types.is_dictionary(field.type):
+                table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+        return table
+    return pa_csv.read_csv(path, convert_options=pa_csv.ConvertOptions(column_types={"date": pa.date32()}))
+
+
+def convert(source_path: str, out_dir: str, version: str, summary: dict) -> str:
+    """Converts a CSV or Parquet dataset into Arrow IPC files partitioned by country/city.
+
+    Each conversion is written to its own `v-<version>` directory and becomes
+    visible when `manifest.json` is atomically replaced to point at it, so
+    readers never see a half-written dataset. Returns the manifest path.
+    """
+    if not HAVE_ARROW:
+        raise RuntimeError("Columnar storage needs pyarrow: pip install pyarrow")
+
+    table = _read_table(source_path)
+    partitioning = [col for col in PARTITION_COLUMNS if col in table.column_names]
+    sort_keys = [(col, "ascending") for col in partitioning + ["date"] if col in table.column_names]
+    if sort_keys:
+        table = table.sort_by(sort_keys)
+    table = _dictionary_encode(table, skip=partitioning)
+
+    os.makedirs(out_dir, exist_ok=True)
+    directory = f"v-{version}"
+    target = os.path.join(out_dir, directory)
+    staging = f"{target}.{os.getpid()}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    ds.write_dataset(
+        table, staging, format="ipc",
+        partitioning=partitioning or None, partitioning_flavor="hive" if partitioning else None,
+        basename_template="part-{i}.arrow", existing_data_behavior="overwrite_or_ignore",
+    )
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+
+    manifest = {
+        "version": version,
+        "directory": directory,
+        "source": os.path.basename(source_path),
+        "columns": table.column_names,
+        "partitioning": partitioning,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "summary": summary,
+    }
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, manifest_path)
+
+    _prune(out_dir, keep=directory)
+    return manifest_path
+
+
+def _prune(out_dir: str, keep: str):
+    versions = sorted(
+        (entry for entry in os.scandir(out_dir) if entry.is_dir() and entry.name.startswith("v-") and entry.name != keep),
+        key=lambda entry: entry.stat().st_mtime, reverse=True,
+    )
+    for entry in versions[KEEP_VERSIONS - 1:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def read_manifest(manifest_path: str) -> dict:
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+class ColumnarSource:
+    """Memory-mapped reader over a converted dataset.
+
+    City and country filters prune whole partition directories; date filters
+    and column selection are applied by the Arrow scanner, so only the matching
+    record batches and columns are materialized as pandas.
+    """
+
+    def __init__(self, manifest_path: str):
+        manifest = read_manifest(manifest_path)
+        self.version = manifest["version"]
+        self.columns = manifest["columns"]
+        self.partitioning = manifest["partitioning"]
+        self.summary = manifest["summary"]
+        self.directory = os.path.join(os.path.dirname(manifest_path), manifest["directory"])
+        self._dataset = ds.dataset(
+            self.directory, format="ipc",
+            partitioning=ds.HivePartitioning.discover(infer_dictionary=True) if self.partitioning else None,
+            filesystem=pa_fs.LocalFileSystem(use_mmap=True),
+        )
+
+    def _filter(self, city: str = None, country: str = None, start_date: str = None, end_date: str = None):
+        conditions = []
+        if city and "city" in self.columns:
+            conditions.append(ds.field("city") == city)
+        if country and "country" in self.columns:
+            conditions.append(ds.field("country") == country)
+        if "date" in self.columns:
+            if start_date:
+                conditions.append(ds.field("date") >= pa.scalar(pd.Timestamp(start_date).date(), pa.date32()))
+            if end_date:
+                conditions.append(ds.field("date") <= pa.scalar(pd.Timestamp(end_date).date(), pa.date32()))
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def scan(self, city: str = None, country: str = None, start_date: str = None, end_date: str = None,
+             columns: list[str] = None) -> pd.DataFrame:
+        wanted = [c for c in (columns or self.columns) if c in self.columns]
+        table = self._dataset.to_table(columns=wanted, filter=self._filter(city, country, start_date, end_date))
+        # Dates as datetime64 rather than Python date objects
+        return table.to_pandas(date_as_object=False)[wanted]
+
+    def read(self) -> pd.DataFrame:
+        return self.scan()
+
+    def partitions(self) -> list[tuple]:
+        """(country, city) of every partition directory, sorted; empty if not partitioned by both."""
+        if self.partitioning != PARTITION_COLUMNS:
+            return []
+        keys = set()
+        for fragment in self._dataset.get_fragments():
+            values = ds.get_partition_keys(fragment.partition_expression)
+            keys.add((values["country"], values["city"]))
+        return sorted(keys)
+
+    def iter_partitions(self, columns: list[str] = None):
+        """Scans one (country, city) partition at a time, so the dataset is never in memory whole."""
+        keys = self.partitions()
+        if not keys:
+            yield self.scan(columns=columns)
+            return
+        for country, city in keys:
+            yield self.scan(city=city, country=country, columns=columns)
@@ -0,0 +1,168 @@
+import os
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+    HAVE_BROTLI = True
+except ImportError:  # gzip is still offered without brotli
+    HAVE_BROTLI = False
+
+from app.services.metrics import stage
+
+# Responses smaller than this are sent as they are; compressing them gains little
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+# Path prefixes whose responses are compressed
+COMPRESS_PATHS = tuple(p.strip() for p in os.getenv("COMPRESS_PATHS", "/analytics/data,/climate/,/predict/batch").split(",")
+                       if p.strip())
+GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+# Brotli's fast range; 11 compresses best but is far too slow for per-request use
+BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def supported_encodings() -> list[str]:
+    """Encodings the server can produce, most preferred first."""
+    return ["br", "gzip"] if HAVE_BROTLI else ["gzip"]
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """The best supported encoding allowed by an Accept-Encoding header; None for identity."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+    best, best_weight = None, 0.0
+    for encoding in supported_encodings():
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        # Ties go to the earlier, more preferred encoding
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class Encoder:
+    """Incremental compressor for one response body."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY, mode=brotli.MODE_TEXT)
+        else:
+            # wbits=31 writes the gzip header and trailer
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        """Compresses a chunk; `flush` makes everything so far decodable, for streamed bodies."""
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            return out + self._compressor.flush() if flush else out
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    encoder = Encoder(encoding)
+    return encoder.compress(data) + encoder.finish()
+
+
+class CompressionMiddleware:
+    """Gzip or brotli compression, negotiated per request, for the COMPRESS_PATHS responses.
+
+    Unlike Starlette's GZipMiddleware it offers brotli and is limited to the
+    routes with large JSON bodies. A buffered body is compressed only when it
+    reaches COMPRESS_MIN_BYTES; a streamed body is compressed chunk by chunk,
+    flushing after each so clients still receive rows as they are produced.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES, paths: tuple = COMPRESS_PATHS):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size))
+
+
+class _CompressingSend:
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start = None
+        self.encoder = None
+        # None until the first body message decides whether to compress
+        self.compressing = None
+
+    def _compressible(self) -> bool:
+        headers = Headers(raw=self.start["headers"])
+        if self.start["status"] < 200 or self.start["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            # Held back until the first body message shows how big the response is
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressing is None:
+            headers = MutableHeaders(scope=self.start)
+            if not self._compressible():
+                self.compressing = False
+            elif not more_body and len(body) < self.minimum_size:
+                self.compressing = False
+                headers.add_vary_header("Accept-Encoding")
+            else:
+                self.compressing = True
+                self.encoder = Encoder(self.encoding)
+                headers["Content-Encoding"] = self.encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["content-length"]
+                if not more_body:
+                    with stage("compression"):
+                        body = self.encoder.compress(body) + self.encoder.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await self.send(self.start)
+                    await self.send({"type": "http.response.body", "body": body})
+                    return
+            await self.send(self.start)
+
+        if not self.compressing:
+            await self.send(message)
+            return
+        with stage("compression"):
+            chunk = self.encoder.compress(body, flush=more_body)
+            if not more_body:
+                chunk += self.encoder.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import threading
+import logging
+
+from app.services.climate_store import PARTITION_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+
+class CorrelationStats:
+    """Mergeable sufficient statistics for a pairwise-complete Pearson correlation matrix.
+
+    For k variables it keeps four k x k matrices, where entry (i, j) only covers
+    rows in which both variable i and variable j are present:
+      n[i, j]  row count
+      s[i, j]  sum of variable i
+      q[i, j]  sum of squares of variable i
+      p[i, j]  sum of products of variables i and j
+    Values are shifted by a fixed per-variable offset before accumulating to keep
+    the sums well conditioned; correlation is unaffected by the shift. Two
+    accumulators with the same shift merge by adding their matrices.
+    """
+
+    def __init__(self, shift: np.ndarray):
+        k = len(shift)
+        self.shift = shift
+        self.n = np.zeros((k, k))
+        self.s = np.zeros((k, k))
+        self.q = np.zeros((k, k))
+        self.p = np.zeros((k, k))
+
+    def update(self, values: np.ndarray):
+        """Adds a block of rows (shape rows x k, NaN for missing readings)."""
+        if len(values) == 0:
+            return self
+        present = ~np.isnan(values)
+        mask = present.astype(np.float64)
+        z = np.where(present, values - self.shift, 0.0)
+        self.n += mask.T @ mask
+        self.s += z.T @ mask
+        self.q += (z * z).T @ mask
+        self.p += z.T @ z
+        return self
+
+    def merge(self, other: "CorrelationStats"):
+        self.n += other.n
+        self.s += other.s
+        self.q += other.q
+        self.p += other.p
+        return self
+
+    @property
+    def count(self) -> int:
+        return int(self.n.diagonal().max()) if len(self.n) else 0
+
+    def correlation(self) -> np.ndarray:
+        n, s, q, p = self.n, self.s, self.q, self.p
+        covariance = n * p - s * s.T
+        variance_i = n * q - s * s
+        variance_j = variance_i.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = covariance / np.sqrt(variance_i * variance_j)
+        # Undefined without two paired readings or with a constant variable
+        corr[(n < 2) | (variance_i <= 0) | (variance_j <= 0)] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+
+class CorrelationEngine:
+    """Per-(country, city) correlation accumulators.
+
+    City, country and global matrices are merged from the per-city statistics in
+    O(cities * k^2), independent of how many rows each city has. Appending rows
+    updates only the affected cities.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.variables = list(frame.select_dtypes(include=["number"]).columns)
+        means = frame[self.variables].mean().to_numpy(dtype=np.float64) if len(frame) else np.zeros(len(self.variables))
+        self._shift = np.nan_to_num(means)
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.append(frame)
+
+    def _values(self, frame: pd.DataFrame) -> np.ndarray:
+        return frame[self.variables].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def append(self, rows: pd.DataFrame):
+        """Folds new rows into the accumulators of their cities."""
+        if rows.empty:
+            return
+        if not all(col in rows.columns for col in PARTITION_COLUMNS):
+            groups = [((None, None), rows)]
+        else:
+            groups = rows.groupby(PARTITION_COLUMNS, observed=True, sort=False)
+        with self._lock:
+            for key, group in groups:
+                stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = CorrelationStats(self._shift)
+                stats.update(self._values(group))
+
+    def stats(self, city: str = None, country: str = None) -> CorrelationStats | None:
+        """Merged accumulator for the matching cities, or None if nothing matches."""
+        with self._lock:
+            matching = [
+                stats for (c_country, c_city), stats in self._stats.items()
+                if (not country or c_country == country) and (not city or c_city == city)
+            ]
+            if not matching:
+                return None
+            merged = CorrelationStats(self._shift)
+            for stats in matching:
+                merged.merge(stats)
+        return merged
+
+    def matrix(self, city: str = None, country: str = None) -> pd.DataFrame | None:
+        stats = self.stats(city=city, country=country)
+        if stats is None or stats.count == 0:
+            return None
+        return pd.DataFrame(stats.correlation(), index=self.variables, columns=self.variables)
@@ -0,0 +1,279 @@
+import os
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+import pandas as pd
+
+from app.services import columnar_store
+from app.services.climate_store import ClimateStore
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+# Converted Arrow copies of the datasets (see scripts/convert_dataset.py)
+COLUMNAR_DIR = os.path.join(DATA_DIR, "columnar")
+# How often the watcher checks dataset files for changes
+POLL_SECONDS = float(os.getenv("DATASET_POLL_SECONDS", "5"))
+
+
+def file_version(path: str) -> str:
+    """Content hash of a dataset file, used to key derived caches."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def read_frame(path: str) -> pd.DataFrame:
+    """Reads a CSV or Parquet dataset file."""
+    if path.endswith(".parquet"):
+        if not columnar_store.HAVE_ARROW:
+            raise RuntimeError("Parquet datasets need pyarrow: pip install pyarrow")
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def summarize(frame: pd.DataFrame) -> dict:
+    """Row count, cities, date bounds and per-column min/max of a raw dataset."""
+    summary = {"rows": len(frame), "columns": list(frame.columns)}
+    if 'city' in frame.columns:
+        summary["cities"] = frame['city'].dropna().unique().tolist()
+    if 'country' in frame.columns:
+        summary["countries"] = frame['country'].dropna().unique().tolist()
+    if 'date' in frame.columns and len(frame):
+        dates = pd.to_datetime(frame['date'], errors='coerce')
+        summary["date_min"] = dates.min().strftime('%Y-%m-%d') if dates.notna().any() else None
+        summary["date_max"] = dates.max().strftime('%Y-%m-%d') if dates.notna().any() else None
+    numeric = frame.select_dtypes(include=["number"])
+    summary["ranges"] = {
+        column: {"min": None if pd.isna(low) else float(low), "max": None if pd.isna(high) else float(high)}
+        for column, low, high in zip(numeric.columns, numeric.min(), numeric.max())
+    }
+    return summary
+
+
+def _version_of(path: str) -> str:
+    if os.path.basename(path) == columnar_store.MANIFEST:
+        return columnar_store.read_manifest(path)["version"]
+    return file_version(path)
+
+
+class Dataset:
+    """One loaded version of a dataset. Treat `frame` as read-only; it is shared.
+
+    CSV datasets are read into memory up front; once the indexed `store` is
+    built it replaces the raw rows, so `frame` is the store's sorted frame and
+    the data is held only once. Columnar datasets keep only a memory-mapped
+    `source`: `scan` reads just the matching partitions and columns, and the
+    full `frame` is materialized on first access.
+    """
+
+    def __init__(self, name: str, path: str, version: str, stat: os.stat_result,
+                 frame: pd.DataFrame = None, source=None):
+        self.name = name
+        self.path = path
+        self.source = source
+        self.version = version
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.loaded_at = datetime.now(timezone.utc)
+        self._frame = frame
+        self._store = None
+        # Reentrant: building the store reads `frame`
+        self._frame_lock = threading.RLock()
+        self.summary = source.summary if source is not None else summarize(frame)
+
+    @property
+    def storage(self) -> str:
+        if self.source is not None:
+            return "columnar"
+        return "parquet" if self.path.endswith(".parquet") else "csv"
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            with self._frame_lock:
+                if self._frame is None:
+                    self._frame = self.source.read()
+        return self._frame
+
+    @property
+    def store(self) -> ClimateStore:
+        """The rows indexed by (country, city) and date, built on first use."""
+        if self._store is None:
+            with self._frame_lock:
+                if self._store is None:
+                    store = ClimateStore(self.frame)
+                    # The store's sorted copy is all that is kept from here on
+                    self._frame = store.frame
+                    self._store = store
+        return self._store
+
+    def scan(self, city: str = None, country: str = None, start_date: str = None, end_date: str = None,
+             columns: list[str] = None) -> pd.DataFrame:
+        """Rows matching the filters, with only `columns` (all when None)."""
+        if self.source is not None:
+            return self.source.scan(city=city, country=country, start_date=start_date, end_date=end_date,
+                                    columns=columns)
+        df = self.store.query(city=city, country=country, start_date=start_date, end_date=end_date)
+        return df[[c for c in columns if c in df.columns]] if columns else df
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "path": os.path.relpath(self.path, BASE_DIR),
+            "version": self.version,
+            "storage": self.storage,
+            "modified_at": datetime.fromtimestamp(self.mtime_ns / 1e9, timezone.utc).isoformat(),
+            "loaded_at": self.loaded_at.isoformat(),
+            **self.summary,
+        }
+
+
+class DatasetRegistry:
+    """Loads each dataset file once and shares it between services.
+
+    A dataset is registered under a name with candidate CSV or Parquet paths
+    (the first one that exists is used) and optionally a columnar directory, which takes
+    precedence once it has been converted and pyarrow is available. Consumers get the current `Dataset` and can subscribe
+    to be called with the new one when the file changes. Changes are picked up
+    by a polling thread comparing mtime and size, then the content hash; the
+    replacement is loaded in the background and swapped in as one reference.
+    """
+
+    def __init__(self):
+        self._paths = {}
+        self._columnar = {}
+        self._datasets = {}
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        # Serializes reloads so a file is only re-read once per change
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def register(self, name: str, *paths: str, columnar: str = None):
+        self._paths.setdefault(name, list(paths))
+        self._columnar[name] = columnar
+
+    def names(self) -> list[str]:
+        return list(self._paths)
+
+    def source_path(self, name: str) -> str | None:
+        for path in self._paths[name]:
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _resolve(self, name: str) -> str | None:
+        source_path = self.source_path(name)
+        columnar = self._columnar.get(name)
+        if columnar and columnar_store.HAVE_ARROW:
+            manifest = os.path.join(columnar, columnar_store.MANIFEST)
+            # A source file edited after the last conversion wins over the stale columnar copy
+            if os.path.exists(manifest) and (source_path is None or
+                                             os.path.getmtime(manifest) >= os.path.getmtime(source_path)):
+                return manifest
+        return source_path
+
+    def _load(self, name: str, path: str) -> Dataset:
+        stat = os.stat(path)
+        if os.path.basename(path) == columnar_store.MANIFEST:
+            source = columnar_store.ColumnarSource(path)
+            logger.info("Mapped columnar dataset %s from %s (version %s)", name, source.directory, source.version)
+            return Dataset(name, path, source.version, stat, source=source)
+        version = file_version(path)
+        frame = read_frame(path)
+        logger.info("Loaded dataset %s from %s (%s rows, version %s)", name, path, len(frame), version)
+        return Dataset(name, path, version, stat, frame=frame)
+
+    def convert(self, name: str) -> str:
+        """Writes the columnar copy of `name` from its CSV or Parquet file; returns the manifest path."""
+        path = self.source_path(name)
+        if path is None:
+            raise FileNotFoundError(f"No CSV or Parquet file found for dataset {name}")
+        summary = summarize(read_frame(path))
+        return columnar_store.convert(path, self._columnar[name], file_version(path), summary)
+
+    def get(self, name: str) -> Dataset | None:
+        """The current version of `name`, loading it on first use; None if no file exists."""
+        dataset = self._datasets.get(name)
+        if dataset is not None:
+            return dataset
+        with self._lock:
+            if name not in self._datasets:
+                path = self._resolve(name)
+                self._datasets[name] = self._load(name, path) if path else None
+            return self._datasets[name]
+
+    def subscribe(self, name: str, callback):
+        """Calls `callback(dataset)` after each new version of `name` is swapped in."""
+        self._subscribers.setdefault(name, []).append(callback)
+
+    def check(self, name: str) -> bool:
+        """Reloads `name` if its file changed; returns whether a new version was swapped in."""
+        if name not in self._datasets:
+            return False
+        with self._reload_lock:
+            return self._reload_if_changed(name)
+
+    def _reload_if_changed(self, name: str) -> bool:
+        current = self._datasets[name]
+        path = self._resolve(name)
+        if path is None:
+            return False
+        stat = os.stat(path)
+        if current is not None and current.path == path and (stat.st_mtime_ns, stat.st_size) == (current.mtime_ns, current.size):
+            return False
+        if current is not None and current.path == path and _version_of(path) == current.version:
+            # Touched but unchanged
+            current.mtime_ns, current.size = stat.st_mtime_ns, stat.st_size
+            return False
+
+        dataset = self._load(name, path)
+        with self._lock:
+            self._datasets[name] = dataset
+        if current is not None and dataset.version == current.version:
+            # Same content in another storage format (e.g. just converted); derived data is still valid
+            return False
+        for callback in self._subscribers.get(name, []):
+            try:
+                callback(dataset)
+            except Exception as e:
+                logger.error("Refreshing a consumer of dataset %s failed: %s", name, e)
+        return True
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            for name in list(self._datasets):
+                try:
+                    self.check(name)
+                except Exception as e:
+                    logger.error("Checking dataset %s for changes failed: %s", name, e)
+
+    def start_watching(self, interval: float = POLL_SECONDS):
+        if self._watcher is not None or interval <= 0:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="dataset-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        self._watcher = None
+
+    def describe(self) -> dict:
+        return {name: dataset.describe() for name, dataset in self._datasets.items() if dataset is not None}
+
+
+dataset_registry = DatasetRegistry()
+# The global dataset served by analytics; the small legacy file is used for model training
+# A Parquet file written by scripts/generate_global_data.py takes precedence over the CSV
+dataset_registry.register("climate", os.path.join(DATA_DIR, "global_climate_data.parquet"),
+                          os.path.join(DATA_DIR, "global_climate_data.csv"),
+                          os.path.join(DATA_DIR, "climate_data.csv"), columnar=os.path.join(COLUMNAR_DIR, "climate"))
+dataset_registry.register("training", os.path.join(DATA_DIR, "climate_data.csv"),
+                          columnar=os.path.join(COLUMNAR_DIR, "training"))
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+METHODS = ("lttb", "minmax")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of the points that best preserve the shape.
+
+    The first and last points are always kept. Within each bucket the point
+    forming the largest triangle with the previously selected point and the
+    average of the next bucket is chosen; the per-bucket work is vectorized.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Bucket edges over the interior points (first and last are fixed)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    # Averages of every bucket up front; each step uses the next bucket's average
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(np.nan_to_num(y[1:n - 1]), edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1] if not np.isnan(y[-1]) else 0.0)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_x, next_y = avg_x[i + 1], avg_y[i + 1]
+        bx = x[lo:hi]
+        by = y[lo:hi]
+        area = np.abs((x[prev] - next_x) * (by - y[prev]) - (x[prev] - bx) * (next_y - y[prev]))
+        # NaN readings never win a bucket
+        area = np.where(np.isnan(area), -1.0, area)
+        prev = lo + int(np.argmax(area))
+        selected[i + 1] = prev
+    return selected
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Keeps the minimum and maximum of each of n_out // 2 equal buckets."""
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    n_buckets = n_out // 2
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+
+    offsets = np.arange(n_buckets) * size
+    mins = offsets + np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1)
+    maxs = offsets + np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+    indices = np.unique(np.concatenate((mins, maxs)))
+    return indices[indices < n]
+
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, max_points: int, method: str = "lttb") -> np.ndarray:
+    if method == "minmax":
+        return minmax_indices(y, max_points)
+    if method == "lttb":
+        return lttb_indices(x, y, max_points)
+    raise ValueError(f"Unknown downsampling method: {method}")
+
+
+def x_values(series: pd.Series) -> np.ndarray:
+    """Numeric x-axis for downsampling: dates become integer timestamps."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.to_numpy().astype("datetime64[ns]").astype(np.int64)
+    return series.to_numpy()
+
+
+def downsample_frame(df: pd.DataFrame, max_points: int, method: str = "lttb", x_col: str = "date") -> pd.DataFrame:
+    """Reduces one series-like frame to at most max_points rows.
+
+    The budget is split between the numeric columns, each is downsampled
+    independently and the union of the selected rows is kept, so a peak in any
+    single variable survives. The first and last rows are always kept; if the
+    union still exceeds max_points its interior is thinned evenly.
+    """
+    n = len(df)
+    if n <= max_points:
+        return df
+    if max_points < 2:
+        return df.iloc[:max(max_points, 0)]
+
+    columns = [c for c in df.select_dtypes(include=["number"]).columns if c != x_col]
+    if not columns:
+        return df.iloc[np.linspace(0, n - 1, max_points).astype(np.int64)]
+
+    x = x_values(df[x_col]) if x_col in df.columns else np.arange(n)
+    # Exact split of the budget; both methods need at least 3 points to do anything useful
+    shares = [max(max_points // len(columns) + (i < max_points % len(columns)), 3) for i in range(len(columns))]
+    keep = [downsample_indices(x, df[col].to_numpy(), share, method) for col, share in zip(columns, shares)]
+    selected = np.unique(np.concatenate(keep + [np.array([0, n - 1])]))
+
+    if len(selected) > max_points:
+        interior = selected[1:-1]
+        picks = np.linspace(0, len(interior) - 1, max_points - 2).round().astype(np.int64)
+        selected = np.concatenate(([0], interior[picks], [n - 1]))
+    return df.iloc[selected]
@@ -0,0 +1,160 @@
+import os
+import asyncio
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.ml_service import ml_service, FEATURES
+from app.services.analytics_service import analytics_service
+from app.services.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+# Requests arriving within this window are scored together in one predict() call
+BATCH_WAIT_MS = float(os.getenv("INFERENCE_BATCH_WAIT_MS", "5"))
+MAX_BATCH_ROWS = int(os.getenv("INFERENCE_MAX_BATCH_ROWS", "8192"))
+
+
+class ModelUnavailableError(Exception):
+    """Raised when no trained model is loaded."""
+
+
+class IncompatibleModelError(Exception):
+    """Raised when the loaded model expects features this service doesn't provide."""
+
+
+class MicroBatcher:
+    """Merges concurrent small scoring requests into a single vectorized call.
+
+    The first submission opens a short window; everything submitted before it
+    closes (or until MAX_BATCH_ROWS rows are queued) is concatenated, scored once
+    on a worker thread and split back per caller.
+    """
+
+    def __init__(self, predict_fn, max_wait_ms: float = BATCH_WAIT_MS, max_rows: int = MAX_BATCH_ROWS):
+        self.predict_fn = predict_fn
+        self.max_wait = max_wait_ms / 1000
+        self.max_rows = max_rows
+        self._pending = []
+        self._pending_rows = 0
+        self._flush_handle = None
+        # The event loop keeps only weak references to tasks; these keep running batches alive
+        self._tasks = set()
+        # One thread: batches are already vectorized, and it keeps the event loop free
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, features: pd.DataFrame) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((features, future))
+        self._pending_rows += len(features)
+        self.requests += 1
+
+        if self._pending_rows >= self.max_rows:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        self.batches += 1
+        frames = [features for features, _ in batch]
+        try:
+            combined = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+            loop = asyncio.get_running_loop()
+            predictions = await loop.run_in_executor(self._executor, self.predict_fn, combined)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for features, future in batch:
+            if not future.done():
+                future.set_result(predictions[offset:offset + len(features)])
+            offset += len(features)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "pending_rows": self._pending_rows,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_batch_rows": self.max_rows,
+        }
+
+
+class InferenceService:
+    """Scores feature rows with the model currently held by MLService."""
+
+    def __init__(self):
+        self.batcher = MicroBatcher(self._predict)
+
+    def model_features(self) -> list[str]:
+        model = ml_service.model
+        if model is None:
+            raise ModelUnavailableError("No trained model is loaded")
+        # The model may have been trained on a subset of FEATURES
+        names = getattr(model, "feature_names_in_", None)
+        if names is None:
+            return list(FEATURES)
+        unknown = [name for name in names if name not in FEATURES]
+        if unknown:
+            raise IncompatibleModelError(f"Loaded model expects unsupported features: {', '.join(unknown)}")
+        return list(names)
+
+    def _predict(self, features: pd.DataFrame) -> np.ndarray:
+        # Read the model once per batch so a hot-swapped model is picked up atomically
+        model = ml_service.model
+        if model is None:
+            raise ModelUnavailableError("No trained model is loaded")
+        with stage("model_inference"):
+            return model.predict(features)
+
+    async def predict_rows(self, rows: list[dict]):
+        await ml_service.aget()
+        features = self.model_features()
+        frame = pd.DataFrame.from_records(rows, columns=FEATURES)
+        missing = [f for f in features if frame[f].isna().any()]
+        if missing:
+            raise ValueError(f"Every row needs values for: {', '.join(missing)}")
+        predictions = await self.batcher.submit(frame[features])
+        return {"features": features, "predictions": predictions.tolist()}
+
+    async def predict_dataset(self, city: str, country: str = None, start_date: str = None, end_date: str = None):
+        await ml_service.aget()
+        features = self.model_features()
+        analytics = await analytics_service.aget()
+        df = analytics.query(city=city, country=country, start_date=start_date, end_date=end_date)
+        if df is None or df.empty:
+            return {"features": features, "predictions": [], "dates": [], "actual": []}
+        missing = [f for f in features if f not in df.columns]
+        if missing:
+            raise ValueError(f"Dataset is missing model features: {', '.join(missing)}")
+
+        # Rows with missing readings can't be scored
+        df = df.dropna(subset=features)
+        predictions = await self.batcher.submit(df[features].reset_index(drop=True))
+        return {
+            "features": features,
+            "predictions": predictions.tolist(),
+            "dates": df['date'].dt.strftime('%Y-%m-%d').tolist() if 'date' in df.columns else [],
+            "actual": [None if v != v else v for v in df['temperature'].tolist()] if 'temperature' in df.columns else [],
+        }
+
+
+inference_service = InferenceService()
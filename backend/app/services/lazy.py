@@ -0,0 +1,85 @@
+import time
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Every LazyService by name, for warm-up and readiness reporting
+registry = {}
+
+
+class LazyService:
+    """Stands in for a service singleton and builds it on first use.
+
+    Attribute access is forwarded to the instance, so call sites keep using the
+    module-level name as before. Construction runs once, under a lock; callers
+    that arrive while another thread is building it wait for that result.
+    Async code should resolve the instance with `await aget()` first, so neither
+    the build nor the wait for it blocks the event loop.
+    """
+
+    def __init__(self, name: str, factory):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "_load_seconds", None)
+        object.__setattr__(self, "_error", None)
+        registry[name] = self
+
+    def get(self):
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                started = time.perf_counter()
+                try:
+                    instance = self._factory()
+                except Exception as e:
+                    object.__setattr__(self, "_error", f"{type(e).__name__}: {e}")
+                    raise
+                object.__setattr__(self, "_load_seconds", time.perf_counter() - started)
+                object.__setattr__(self, "_error", None)
+                object.__setattr__(self, "_instance", instance)
+                logger.info("Loaded %s in %.2fs", self._name, self._load_seconds)
+            return self._instance
+
+    async def aget(self):
+        """get() for the event loop: building, or waiting for a build, happens on a worker thread."""
+        instance = self._instance
+        if instance is not None:
+            return instance
+        return await asyncio.to_thread(self.get)
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def status(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "load_seconds": round(self._load_seconds, 3) if self._load_seconds is not None else None,
+            "error": self._error,
+        }
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.get(), name, value)
+
+
+def warm_up():
+    """Builds every registered service; meant to run off the event loop at startup."""
+    for name, service in list(registry.items()):
+        try:
+            service.get()
+        except Exception as e:
+            logger.error("Warm-up of %s failed: %s", name, e)
+
+
+def readiness() -> dict:
+    services = {name: service.status() for name, service in registry.items()}
+    return {"ready": all(status["loaded"] for status in services.values()), "services": services}
@@ -0,0 +1,197 @@
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Upper bounds (seconds) shared by every latency histogram
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, in Prometheus terms."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts, then total count and sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(counts), count, total) for labels, (counts, count, total) in self._series.items()]
+        for labels, counts, count, total in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = _labels(self.label_names, labels, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            bucket_labels = _labels(self.label_names, labels, 'le="+Inf"')
+            series_labels = _labels(self.label_names, labels)
+            lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+            lines.append(f"{self.name}_count{series_labels} {count}")
+            lines.append(f"{self.name}_sum{series_labels} {total:.6f}")
+        return lines
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for labels, value in snapshot:
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+
+class Counter(Gauge):
+    kind = "counter"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+request_duration = registry.add(Histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte.",
+    labels=("method", "route", "status"),
+))
+requests_in_flight = registry.add(Gauge(
+    "http_requests_in_flight", "Requests currently being handled.", labels=("method",),
+))
+stage_duration = registry.add(Histogram(
+    "stage_duration_seconds", "Time spent in internal stages of request handling.", labels=("stage",),
+))
+stage_errors = registry.add(Counter(
+    "stage_errors_total", "Internal stages that raised.", labels=("stage",),
+))
+
+
+@contextmanager
+def stage(name: str):
+    """Times a block into stage_duration_seconds{stage=name}; usable in sync and async code."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        stage_errors.inc(name)
+        raise
+    finally:
+        stage_duration.observe(time.perf_counter() - started, name)
+
+
+def _route_template(scope) -> str:
+    """The matched route's path template, e.g. /predict/train/{job_id}.
+
+    Rebuilt from the request path and the path parameters routing extracted,
+    which works however routers were included. Unmatched paths share one label
+    so arbitrary URLs can't grow the number of series.
+    """
+    if "route" not in scope:
+        return "unmatched"
+    path = scope["path"]
+    params = scope.get("path_params")
+    if not params:
+        return path
+    segments = path.split("/")
+    for name, value in params.items():
+        value = str(value)
+        for i in range(len(segments) - 1, -1, -1):
+            if segments[i] == value:
+                segments[i] = "{%s}" % name
+                break
+    return "/".join(segments)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests.
+
+    Written against raw ASGI rather than BaseHTTPMiddleware so streaming
+    responses pass through untouched; latency covers the whole body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        requests_in_flight.inc(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requests_in_flight.dec(method)
+            # Routing has filled in the scope by now
+            request_duration.observe(time.perf_counter() - started, method, _route_template(scope), str(status))
@@ -1,24 +1,177 @@
 import os
 import pickle
+import importlib.util
+import asyncio
 import pandas as pd
-import requests
 import logging
 
+from app.services.weather_client import weather_client, WeatherAPIError
+from app.services.weather_cache import weather_cache, CURRENT_TTL, FORECAST_TTL
+from app.services.notification_service import notification_service
+from app.services.lazy import LazyService
+from app.services.dataset_registry import dataset_registry
+from app.services.metrics import stage
+
 logger = logging.getLogger(__name__)
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
-DATA_PATH = os.path.join(BASE_DIR, "data", "climate_data.csv")
 
-# Constants
-API_KEY = 'd2a0b86d0e5883fad5d67f7002929b49'
-BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
+# Inputs of the temperature model
+FEATURES = ['humidity', 'co2_levels', 'wind_speed', 'rainfall', 'pressure']
+TRAINING_COLUMNS = FEATURES + ['temperature']
+TRAINING_DATASET = "training"
+
+def classify_alert(current_temp: float) -> str:
+    """Alert colour for a temperature reading (logic from legacy code)."""
+    if current_temp > 30:
+        return "danger"
+    if current_temp < 20:
+        return "warning"
+    return "success"
+
+def parse_forecast(payload, count: int = 5) -> list[dict]:
+    """The next `count` forecast intervals; an unexpected payload yields no forecast rather than an error."""
+    items = payload.get('list') if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        return []
+    forecast = []
+    try:
+        for item in items[:count]:
+            forecast.append({
+                "time": pd.to_datetime(item['dt'], unit='s').strftime('%H:%M'),
+                "temp": item['main']['temp']
+            })
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning("Ignoring malformed forecast from provider: %r", e)
+        return []
+    return forecast
+
+def temperature_trend(current_temp: float) -> str:
+    return "further increase" if current_temp > 28 else "remain stable"
+
+def fit_temperature_model(data: pd.DataFrame, n_estimators: int = 100, n_jobs: int = None, progress=None):
+    """Fits the temperature RandomForest, reporting progress as trees are added.
+
+    Trees are grown in ten warm-started steps so `progress(fraction)` can be
+    called between them; the result is the same forest as a single fit.
+    """
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.model_selection import train_test_split
+
+    features = data[FEATURES]
+    target = data['temperature']
+
+    X_train, X_test, y_train, y_test = train_test_split(features, target, test_size=0.2, random_state=42)
+
+    model = RandomForestRegressor(n_estimators=0, random_state=42, n_jobs=n_jobs, warm_start=True)
+    step = max(1, n_estimators // 10)
+    for built in range(step, n_estimators + step, step):
+        model.n_estimators = min(built, n_estimators)
+        model.fit(X_train, y_train)
+        if progress:
+            progress(model.n_estimators / n_estimators)
+        if model.n_estimators == n_estimators:
+            break
+
+    return model, model.score(X_test, y_test)
+
+def save_model(model, path: str):
+    """Pickles to a temporary file beside `path` and renames it into place atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(model, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+async def predict_weather(city: str, country: str):
+    """Fetches weather from OpenWeatherMap and makes a simple prediction.
+
+    Needs neither the trained model nor a dataset, so it doesn't go through MLService.
+    """
+    if not city or not country:
+        return {"error": "City and Country are required"}
+
+    logger.debug("Fetching weather and forecast for %s, %s", city, country)
+
+    # Current weather and forecast are independent, so fetch them concurrently
+    current_result, forecast_result = await asyncio.gather(
+        weather_cache.get_or_fetch("weather", city, country, CURRENT_TTL,
+                                   lambda: weather_client.fetch_current(city, country)),
+        weather_cache.get_or_fetch("forecast", city, country, FORECAST_TTL,
+                                   lambda: weather_client.fetch_forecast(city, country)),
+        return_exceptions=True,
+    )
+
+    if isinstance(current_result, WeatherAPIError):
+        logger.debug("Weather API error: %s", current_result.message)
+        return {"error": f"Weather API Error: {current_result.message}"}
+    if isinstance(current_result, Exception):
+        logger.debug("Weather fetch failed: %s", current_result)
+        return {"error": str(current_result)}
+
+    weather_data = current_result
+    main = weather_data.get('main') if isinstance(weather_data, dict) else None
+    current_temp = main.get('temp') if isinstance(main, dict) else None
+    if not isinstance(current_temp, (int, float)) or isinstance(current_temp, bool):
+        logger.debug("'temp' missing in response")
+        return {"error": "Temperature data missing from provider"}
+
+    # The upstream calls themselves are timed as upstream_weather and upstream_forecast
+    with stage("classify"):
+        alert_color = classify_alert(current_temp)
+        if alert_color == "danger":
+            notification_service.alert_temperature(city, country, current_temp)
+        trend = temperature_trend(current_temp)
+        prediction_text = f"Current temperature for {city}, {country}: {current_temp:.2f}°C. The temperature is expected to {trend}."
+
+    hourly_forecast = []
+    if isinstance(forecast_result, Exception):
+        logger.debug("Forecast failed: %s", forecast_result)
+    else:
+        hourly_forecast = parse_forecast(forecast_result)
+
+    return {
+        "current_temp": current_temp,
+        "prediction": prediction_text,
+        "alert_color": alert_color,
+        "weather_data": weather_data,
+        "hourly_forecast": hourly_forecast
+    }
+
+async def predict_many(locations, concurrency: int = 16):
+    """Runs predict_weather for many (city, country) pairs with bounded concurrency.
+
+    Yields (index, result) pairs in completion order.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index, city, country):
+        async with semaphore:
+            try:
+                return index, await predict_weather(city, country)
+            except Exception as e:
+                return index, {"error": str(e)}
+
+    tasks = [asyncio.ensure_future(run(i, city, country)) for i, (city, country) in enumerate(locations)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Stop outstanding work if the consumer goes away (e.g. a dropped stream)
+        for task in tasks:
+            task.cancel()
 
 class MLService:
     def __init__(self):
         self.model = None # Lazy load or load safely
-        self.data = self._load_data()
+        self.model_version = None
+        self._anomaly_result = None
+        # Load the training data up front, as part of service start-up
+        dataset_registry.get(TRAINING_DATASET)
         # Attempt to load model safely without crashing app if sklearn fails
         try:
             self.model = self._load_model()
@@ -33,136 +186,62 @@ class MLService:
                 with open(MODEL_PATH, 'rb') as file:
                     return pickle.load(file)
         except Exception as e:
-            logger.error(f"Failed to load model: {e}")
+            logger.error("Failed to load model: %s", e)
             return None
 
-    def _load_data(self):
-        if os.path.exists(DATA_PATH):
-            return pd.read_csv(DATA_PATH)
-        return None
-
-    def predict_weather(self, city: str, country: str):
-        """Fetches weather from OpenWeatherMap and makes a simple prediction."""
-        if not city or not country:
-            return {"error": "City and Country are required"}
-
-        # Use params for safe URL encoding
-        params = {
-            "q": f"{city},{country}",
-            "appid": API_KEY,
-            "units": "metric"
-        }
-        
-        print(f"DEBUG: Fetching weather for {city}, {country}")
-        
-        try:
-            response = requests.get(BASE_URL, params=params)
-            print(f"DEBUG: Weather API Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                weather_data = response.json()
-                # print(f"DEBUG: Weather Data: {weather_data}") # Uncomment for verbose logs
-
-                current_temp = weather_data.get('main', {}).get('temp')
-                if current_temp is None:
-                     print("DEBUG: 'temp' missing in response")
-                     return {"error": "Temperature data missing from provider"}
-
-                # Logic from legacy code
-                if current_temp > 30:
-                    alert_color = "danger"
-                elif current_temp < 20:
-                    alert_color = "warning"
-                else:
-                    alert_color = "success"
-
-                trend = "further increase" if current_temp > 28 else "remain stable"
-                prediction_text = f"Current temperature for {city}, {country}: {current_temp:.2f}°C. The temperature is expected to {trend}."
-
-                # Fetch Forecast Data
-                forecast_url = "https://api.openweathermap.org/data/2.5/forecast"
-                forecast_params = {
-                    "q": f"{city},{country}",
-                    "appid": API_KEY,
-                    "units": "metric"
-                }
-                
-                print("DEBUG: Fetching forecast...")
-                forecast_response = requests.get(forecast_url, params=forecast_params)
-                hourly_forecast = []
-                
-                if forecast_response.status_code == 200:
-                    forecast_data = forecast_response.json()
-                    # Get next 5 intervals
-                    if 'list' in forecast_data:
-                        for item in forecast_data['list'][:5]:
-                            hourly_forecast.append({
-                                "time": pd.to_datetime(item['dt'], unit='s').strftime('%H:%M'),
-                                "temp": item['main']['temp']
-                            })
-                else:
-                    print(f"DEBUG: Forecast failed: {forecast_response.status_code}")
-
-                return {
-                    "current_temp": current_temp,
-                    "prediction": prediction_text,
-                    "alert_color": alert_color,
-                    "weather_data": weather_data,
-                    "hourly_forecast": hourly_forecast
-                }
-            else:
-                error_msg = response.json().get('message', 'Unknown error')
-                print(f"DEBUG: API Error: {error_msg}")
-                return {"error": f"Weather API Error: {error_msg}"}
-                
-        except Exception as e:
-            print(f"DEBUG: Exception: {str(e)}")
-            return {"error": str(e)}
+    @property
+    def dataset(self):
+        return dataset_registry.get(TRAINING_DATASET)
+
+    @property
+    def data(self):
+        dataset = self.dataset
+        return dataset.frame if dataset is not None else None
 
     def train_model(self):
         """Retrains the model (Legacy logic)"""
-        try:
-            from sklearn.ensemble import RandomForestRegressor
-            from sklearn.model_selection import train_test_split
-        except ImportError:
+        if importlib.util.find_spec("sklearn") is None:
             return {"error": "sklearn not installed"}
 
-        if self.data is None:
+        dataset = self.dataset
+        if dataset is None:
             return {"error": "No data available for training"}
 
-        features = self.data[['humidity', 'co2_levels', 'wind_speed', 'rainfall', 'pressure']]
-        target = self.data['temperature']
-        
-        X_train, X_test, y_train, y_test = train_test_split(features, target, test_size=0.2, random_state=42)
-        
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
-        model.fit(X_train, y_train)
-        
-        accuracy = model.score(X_test, y_test)
+        model, accuracy = fit_temperature_model(dataset.scan(columns=TRAINING_COLUMNS))
         
         # Save the new model
-        os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-        with open(MODEL_PATH, 'wb') as file:
-            pickle.dump(model, file)
-            
-        self.model = model
+        save_model(model, MODEL_PATH)
+        self.swap_model(model)
         return {"accuracy": accuracy}
 
+    def swap_model(self, model, version: str = None):
+        """Replaces the serving model; readers see either the old or the new one, never a mix."""
+        self.model = model
+        self.model_version = version
+
     def detect_anomalies(self):
         """Detects anomalies (Legacy logic)"""
+        # Fit once per dataset version and reuse the result.
+        # Per-city scores and explanations are served by AnalyticsService.get_anomalies.
+        dataset = self.dataset
+        version = dataset.version if dataset is not None else None
+        if self._anomaly_result is not None and self._anomaly_result[0] == version:
+            return self._anomaly_result[1]
+
         try:
             from sklearn.ensemble import IsolationForest
         except ImportError:
             return {"error": "sklearn not installed"}
 
-        if self.data is None:
+        if dataset is None:
             return {"error": "No data available"}
             
-        features = self.data[['temperature', 'humidity', 'co2_levels', 'wind_speed', 'rainfall', 'pressure']]
+        features = dataset.frame[['temperature', 'humidity', 'co2_levels', 'wind_speed', 'rainfall', 'pressure']]
         iso_forest = IsolationForest(contamination=0.05, random_state=42)
         anomalies = iso_forest.fit_predict(features)
         
         count = list(anomalies).count(-1)
-        return {"anomalies_detected": count}
+        self._anomaly_result = (version, {"anomalies_detected": count})
+        return self._anomaly_result[1]
 
-ml_service = MLService()
+ml_service = LazyService("ml_service", MLService)
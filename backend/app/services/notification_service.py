@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from app.database import get_database, keyset_page
+from app.services.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber; a slower client loses its oldest events rather than blocking others
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("NOTIFICATION_QUEUE_SIZE", "100"))
+# The same automatic alert (e.g. one city's heat) is raised at most once per cooldown
+ALERT_COOLDOWN = float(os.getenv("ALERT_COOLDOWN_SECONDS", "3600"))
+# Anomalies scoring below this raise a "danger" alert; 0 is the detectors' own cut-off
+ANOMALY_ALERT_SCORE = float(os.getenv("ANOMALY_ALERT_SCORE", "-0.1"))
+
+
+def to_notification(document: dict) -> dict:
+    """API shape of a stored notification."""
+    document = dict(document)
+    document["id"] = str(document.pop("_id"))
+    timestamp = document.get("timestamp")
+    if isinstance(timestamp, datetime) and timestamp.tzinfo is None:
+        document["timestamp"] = timestamp.replace(tzinfo=timezone.utc)
+    return document
+
+
+class NotificationHub:
+    """In-process fan-out of new notifications to live subscribers.
+
+    Each event is encoded once and handed to every subscriber's bounded queue
+    without awaiting, so one slow connection never delays the others.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, notification: dict):
+        payload = json.dumps(notification, default=str)
+        self.published += 1
+        for queue in list(self._subscribers):
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(payload)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "queue_size": self.queue_size,
+        }
+
+
+class NotificationService:
+    """Notifications persisted in Mongo and pushed to live subscribers."""
+
+    def __init__(self):
+        self.hub = NotificationHub()
+        self._loop = None
+        self._last_alert = {}
+        self._tasks = set()
+
+    def _collection(self):
+        return get_database().get_collection("notifications")
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop = None):
+        """Remembers the event loop so alerts raised on worker threads can be delivered."""
+        self._loop = loop or asyncio.get_running_loop()
+
+    async def create(self, title: str, message: str, type: str = "info", source: str = None) -> dict:
+        document = {
+            "title": title,
+            "message": message,
+            "type": type,
+            "source": source,
+            "timestamp": datetime.now(timezone.utc),
+            "read": False,
+        }
+        try:
+            with stage("mongo"):
+                result = await self._collection().insert_one(document)
+            document["_id"] = result.inserted_id
+        except Exception as e:
+            # Still deliver to connected clients; the notification just won't be listed later
+            logger.error("Could not store notification '%s': %s", title, e)
+            document["_id"] = ObjectId()
+        notification = to_notification(document)
+        self.hub.publish(notification)
+        return notification
+
+    def _cooling_down(self, key) -> bool:
+        now = time.monotonic()
+        last = self._last_alert.get(key)
+        if last is not None and now - last < ALERT_COOLDOWN:
+            return True
+        self._last_alert[key] = now
+        return False
+
+    def alert(self, key, title: str, message: str, type: str = "danger", source: str = None):
+        """Raises an automatic alert in the background, at most once per ALERT_COOLDOWN for `key`.
+
+        Safe to call from the event loop or from a worker thread.
+        """
+        if self._cooling_down(key):
+            return
+        coro = self.create(title, message, type=type, source=source)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            self.bind_loop(loop)
+            task = loop.create_task(coro)
+            # Keep a reference until it finishes so the task isn't garbage collected
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif self._loop is not None and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(coro, self._loop)
+        else:
+            coro.close()
+            logger.warning("Dropped alert '%s': no event loop to deliver it on", title)
+
+    def alert_temperature(self, city: str, country: str, temperature: float):
+        self.alert(
+            ("temperature", city.lower(), country.lower()),
+            "High Temperature Alert",
+            f"{city}, {country} temperature is {temperature:.1f}°C.",
+            source="prediction",
+        )
+
+    def alert_anomalies(self, anomalies: list[dict]):
+        """One alert per city whose anomalies score below ANOMALY_ALERT_SCORE."""
+        worst = {}
+        for anomaly in anomalies:
+            if anomaly["score"] >= ANOMALY_ALERT_SCORE:
+                continue
+            key = (anomaly["country"], anomaly["city"])
+            if key not in worst or anomaly["score"] < worst[key]["score"]:
+                worst[key] = anomaly
+        for (country, city), anomaly in worst.items():
+            variables = ", ".join(c["variable"] for c in anomaly["contributors"])
+            place = ", ".join(part for part in (city, country) if part) or "Dataset"
+            self.alert(
+                ("anomaly", country, city),
+                "Climate Anomaly Detected",
+                f"{place}: unusual {variables} on {anomaly['date']} (score {anomaly['score']}).",
+                source="anomaly",
+            )
+
+    async def list_page(self, after: str = None, limit: int = 50, unread: bool = False):
+        """Newest first; returns (notifications, next_cursor)."""
+        query = {"read": False} if unread else {}
+        documents, next_cursor = await keyset_page(
+            self._collection(), query, ["timestamp", "_id"], after=after, limit=limit, descending=True,
+        )
+        return [to_notification(document) for document in documents], next_cursor
+
+    async def unread_count(self) -> int:
+        with stage("mongo"):
+            return await self._collection().count_documents({"read": False})
+
+    async def mark_read(self, ids: list[str] = None) -> int:
+        """Marks the given notifications (or every unread one when `ids` is None) as read."""
+        if ids is None:
+            query = {"read": False}
+        else:
+            try:
+                query = {"_id": {"$in": [ObjectId(i) for i in ids]}, "read": False}
+            except (InvalidId, TypeError):
+                raise ValueError("Invalid notification id")
+        with stage("mongo"):
+            result = await self._collection().update_many(query, {"$set": {"read": True}})
+        return result.modified_count
+
+
+notification_service = NotificationService()
@@ -0,0 +1,269 @@
+import io
+import asyncio
+import logging
+import os
+import sys
+import hmac
+import time
+import uuid
+import random
+import marshal
+import pstats
+import threading
+from collections import Counter, deque
+from datetime import datetime, timezone
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+# Shared secret that turns on per-request profiling; unset leaves it off entirely
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")
+# Fraction of requests under PROFILE_PATHS profiled without asking; needs PROFILING_TOKEN too,
+# since the token is what lets anyone fetch the profiles
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_PATHS = tuple(p.strip() for p in os.getenv("PROFILE_PATHS", "/analytics/,/predict/").split(",") if p.strip())
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+# Completed profiles kept in memory; the oldest is dropped first
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+# Requests profiled at the same time; others beyond this run unprofiled
+PROFILE_MAX_ACTIVE = int(os.getenv("PROFILE_MAX_ACTIVE", "2"))
+
+TOKEN_HEADER = b"x-profile-token"
+TOKEN_PARAM = "profile_token"
+MAX_DEPTH = 128
+# Leaf functions of a thread with nothing to do; such samples are dropped, except on
+# the event loop thread, where they show time spent waiting on I/O
+_IDLE_LEAVES = {("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"),
+                ("queue.py", "get"), ("selectors.py", "select")}
+
+
+def profiling_enabled() -> bool:
+    """True when PROFILING_TOKEN is set; sampled profiles could never be fetched without it."""
+    if not PROFILING_TOKEN and PROFILE_SAMPLE_RATE > 0:
+        logger.warning("PROFILE_SAMPLE_RATE is set but PROFILING_TOKEN is not; profiling stays off")
+    return bool(PROFILING_TOKEN)
+
+
+def token_valid(token: str | None) -> bool:
+    return bool(PROFILING_TOKEN) and token is not None and hmac.compare_digest(token, PROFILING_TOKEN)
+
+
+def _short_path(filename: str) -> str:
+    """Path relative to the sys.path entry it was imported from, i.e. the module path."""
+    for prefix in sorted((p for p in sys.path if p and os.path.isabs(p)), key=len, reverse=True):
+        if filename.startswith(prefix + os.sep):
+            return filename[len(prefix) + 1:]
+    return filename
+
+
+class SamplingProfiler:
+    """Samples the stacks of every thread at a fixed interval from a background thread.
+
+    Sampling rather than tracing (cProfile) because a request's work is spread
+    over the event loop and worker threads, and a tracer only sees the thread it
+    was started on. Samples are wall-clock and process-wide, so requests running
+    at the same time show up too. Chart rendering runs in separate processes and
+    appears only as the time spent awaiting it.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._loop_thread = threading.get_ident()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Signals the sampling thread to finish; join() waits for it."""
+        self._stop.set()
+
+    def join(self):
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident, "thread")
+                if ident == own or name == "profiler":
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                if not stack:
+                    continue
+                leaf = (os.path.basename(stack[0][0]), stack[0][2])
+                if leaf in _IDLE_LEAVES and ident != self._loop_thread:
+                    continue
+                self.stacks[(name, tuple(reversed(stack)))] += 1
+            self.samples += 1
+
+
+class Profile:
+    def __init__(self, profile_id: str, method: str, path: str, profiler: SamplingProfiler, status: int,
+                 duration: float):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.status = status
+        self.duration = duration
+        self.created_at = datetime.now(timezone.utc)
+        self.interval = profiler.interval
+        self.samples = profiler.samples
+        self.stacks = profiler.stacks
+
+    def describe(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": round(self.duration * 1000, 2),
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    def collapsed(self) -> str:
+        """Folded stacks ("thread;frame;frame count"), the input format of flamegraph.pl and speedscope."""
+        lines = []
+        labels = {}
+        for (thread, stack), count in self.stacks.most_common():
+            for frame in stack:
+                if frame not in labels:
+                    filename, line, func = frame
+                    labels[frame] = f"{func} ({_short_path(filename)}:{line})"
+            frames = ";".join(labels[frame] for frame in stack)
+            lines.append(f"{thread};{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def _pstats_table(self) -> dict:
+        # Each sample counts as one call of `interval` seconds; that keeps the
+        # pstats invariants (cumulative >= own time) without real call counts
+        table = {}
+        for (_, stack), count in self.stacks.items():
+            seconds = count * self.interval
+            seen = set()
+            for depth, key in enumerate(stack):
+                # [primitive calls, calls, own time, cumulative time, callers]
+                entry = table.setdefault(key, [0, 0, 0.0, 0.0, {}])
+                if depth == len(stack) - 1:
+                    entry[2] += seconds
+                if key not in seen:
+                    # Recursive frames count once towards cumulative time
+                    seen.add(key)
+                    entry[0] += count
+                    entry[1] += count
+                    entry[3] += seconds
+                if depth:
+                    caller = stack[depth - 1]
+                    entry[4][caller] = entry[4].get(caller, 0) + count
+        return {key: tuple(value) for key, value in table.items()}
+
+    def pstats_dump(self) -> bytes:
+        """The profile in the binary format written by cProfile (loadable by pstats, snakeviz)."""
+        return marshal.dumps(self._pstats_table())
+
+    def pstats_text(self, sort: str = "cumulative", limit: int = 50) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(_StatsSource(self._pstats_table()), stream=stream)
+        stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+
+class _StatsSource:
+    # pstats.Stats accepts any object with create_stats() and a `stats` table
+    def __init__(self, table: dict):
+        self.stats = table
+
+    def create_stats(self):
+        pass
+
+
+class ProfileStore:
+    def __init__(self, keep: int = PROFILE_KEEP):
+        self._profiles = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self.active = 0
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> Profile | None:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def list(self) -> list[dict]:
+        with self._lock:
+            return [p.describe() for p in reversed(self._profiles)]
+
+
+profile_store = ProfileStore()
+
+
+def _requested(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == TOKEN_HEADER:
+            return token_valid(value.decode("latin-1"))
+    query = scope.get("query_string", b"")
+    if TOKEN_PARAM.encode() in query:
+        return token_valid(parse_qs(query.decode("latin-1")).get(TOKEN_PARAM, [None])[0])
+    return False
+
+
+class ProfilingMiddleware:
+    """Profiles requests that carry the profiling token, plus a random sample.
+
+    Only added to the app when profiling is configured, so an unconfigured
+    deployment has no extra layer at all. A profiled response carries its
+    profile's id in X-Profile-Id; fetch it from /system/profiles/{id}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _should_profile(self, scope) -> bool:
+        if profile_store.active >= PROFILE_MAX_ACTIVE:
+            return False
+        if _requested(scope):
+            return True
+        return (bool(PROFILING_TOKEN) and PROFILE_SAMPLE_RATE > 0 and scope["path"].startswith(PROFILE_PATHS)
+                and random.random() < PROFILE_SAMPLE_RATE)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler()
+        profile_id = uuid.uuid4().hex[:12]
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profile_store.active += 1
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            duration = time.perf_counter() - started
+            profile_store.active -= 1
+            # The sampler may be part-way through walking every thread's stack; wait
+            # for it off the event loop before its counts are read
+            await asyncio.get_running_loop().run_in_executor(None, profiler.join)
+            profile_store.add(Profile(profile_id, scope["method"], scope["path"], profiler, status, duration))
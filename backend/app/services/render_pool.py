@@ -0,0 +1,133 @@
+import os
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.services.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+# Jobs allowed to be running or waiting for a worker before new ones are refused
+RENDER_MAX_PENDING = int(os.getenv("RENDER_MAX_PENDING", "16"))
+RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", "30"))
+
+
+class RenderQueueFull(Exception):
+    """Raised when the render queue is saturated; callers should back off."""
+
+
+class RenderTimeout(Exception):
+    """Raised when a render job does not finish within RENDER_TIMEOUT."""
+
+
+# Per-process state of a render worker
+_worker_service = None
+
+
+def _init_worker():
+    global _worker_service
+    import matplotlib
+    matplotlib.use("Agg")
+    # Workers read a columnar dataset through shared memory maps; a CSV one is loaded per worker
+    from app.services.analytics_service import AnalyticsService
+    _worker_service = AnalyticsService(preload=False)
+
+
+def _render(chart: str, params: dict):
+    # Workers hold their own copy of the dataset; catch up if the file changed since
+    _worker_service.refresh()
+    if chart == "correlation":
+        return _worker_service.generate_correlation_matrix(**params)
+    if chart == "comparison":
+        return _worker_service.generate_variable_comparison(**params)
+    raise ValueError(f"Unknown chart type: {chart}")
+
+
+class RenderPool:
+    """Renders analytics charts in a pool of worker processes.
+
+    Matplotlib is not safe to drive from several threads, so each chart is
+    rendered in a separate process with its own matplotlib state and dataset.
+    At most `max_pending` jobs may be outstanding; beyond that `render` raises
+    RenderQueueFull immediately instead of queueing without bound. A job holds
+    its slot until its worker is done with it, even if the caller timed out.
+    """
+
+    def __init__(self, workers: int = RENDER_WORKERS, max_pending: int = RENDER_MAX_PENDING,
+                 timeout: float = RENDER_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = None
+        self._pending = 0
+        # Slots are released from the executor's callback thread
+        self._pending_lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn rather than fork: workers must not inherit the event loop or held locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return self._executor
+
+    def _release(self, future):
+        with self._pending_lock:
+            self._pending -= 1
+
+    async def render(self, chart: str, **params):
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise RenderQueueFull(f"Render queue is full ({self.max_pending} jobs pending)")
+            self._pending += 1
+
+        try:
+            job = self._get_executor().submit(_render, chart, params)
+        except BaseException:
+            self._release(None)
+            raise
+        # Released when the worker finishes (or the job is cancelled before starting),
+        # not when the caller stops waiting
+        job.add_done_callback(self._release)
+        try:
+            # A timed-out job can't be interrupted inside the worker; it runs to
+            # completion there but its result is discarded
+            with stage("chart_render"):
+                result = await asyncio.wait_for(asyncio.wrap_future(job), self.timeout)
+            self.completed += 1
+            return result
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise RenderTimeout(f"Rendering {chart} took longer than {self.timeout}s")
+        except BrokenProcessPool:
+            logger.error("Render worker pool died; it will be restarted on the next job")
+            self._executor = None
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+render_pool = RenderPool()
@@ -0,0 +1,135 @@
+import pandas as pd
+import logging
+
+from app.services.climate_store import PARTITION_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Week buckets start on Monday and are labelled by that Monday
+GRAINS = {
+    "day": dict(freq="D"),
+    "week": dict(freq="W-MON", label="left", closed="left"),
+    "month": dict(freq="MS"),
+    "year": dict(freq="YS"),
+}
+AGGREGATIONS = ("mean", "min", "max", "sum", "count", "std")
+
+
+def period_start(ts: pd.Timestamp, grain: str) -> pd.Timestamp:
+    """Label of the bucket that contains ts at the given grain."""
+    ts = ts.normalize()
+    if grain == "week":
+        return ts - pd.Timedelta(days=ts.weekday())
+    if grain == "month":
+        return ts.replace(day=1)
+    if grain == "year":
+        return ts.replace(month=1, day=1)
+    return ts
+
+
+class RollupEngine:
+    """Per-(country, city) aggregates of every numeric variable, precomputed per grain.
+
+    Cubes are built once when the dataset loads; a query only slices the cube
+    for the requested cities, periods, variables and aggregations. Rolling
+    windows are applied on demand over the sliced cube.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.variables = [c for c in frame.select_dtypes(include=["number"]).columns]
+        self._cubes = self._build(frame)
+        if self._cubes:
+            logger.info("Built rollup cubes for %s variables at %s grains", len(self.variables), len(self._cubes))
+
+    @classmethod
+    def from_partitions(cls, partitions):
+        """Builds the cubes one partition at a time, so only one partition's rows are in memory.
+
+        Each frame yielded by `partitions` must hold whole (country, city) series;
+        the cubes are the same as those built from all of the rows at once.
+        """
+        engine = cls(pd.DataFrame())
+        pieces = []
+        for frame in partitions:
+            if not engine.variables:
+                engine.variables = [c for c in frame.select_dtypes(include=["number"]).columns]
+            cubes = engine._build(frame)
+            if cubes:
+                pieces.append(cubes)
+        if pieces:
+            engine._cubes = {grain: pd.concat([cubes[grain] for cubes in pieces]).sort_index() for grain in GRAINS}
+            logger.info("Built rollup cubes for %s variables at %s grains from %s partitions",
+                        len(engine.variables), len(engine._cubes), len(pieces))
+        return engine
+
+    def _build(self, frame: pd.DataFrame) -> dict:
+        if frame.empty or 'date' not in frame.columns or not all(c in frame.columns for c in PARTITION_COLUMNS):
+            return {}
+        cubes = {}
+        for grain, grouper in GRAINS.items():
+            grouped = frame.groupby(PARTITION_COLUMNS + [pd.Grouper(key='date', **grouper)], observed=True)
+            cube = grouped[self.variables].agg(list(AGGREGATIONS))
+            cube.index = cube.index.set_names(PARTITION_COLUMNS + ['period'])
+            cubes[grain] = cube
+        return cubes
+
+    def query(self, grain: str, aggs: list[str], variables: list[str], city: str = None, country: str = None,
+              start_date: str = None, end_date: str = None, window: int = None) -> pd.DataFrame:
+        """Slice of the cube with (variable, agg) columns, indexed by (country, city, period).
+
+        With window set, each selected column becomes its rolling mean over the
+        previous `window` periods of the same city.
+        """
+        if grain not in GRAINS:
+            raise ValueError(f"Unknown grain '{grain}'. Use one of: {', '.join(GRAINS)}")
+        unknown_aggs = [a for a in aggs if a not in AGGREGATIONS]
+        if unknown_aggs:
+            raise ValueError(f"Unknown aggregation(s): {', '.join(unknown_aggs)}")
+        unknown_vars = [v for v in variables if v not in self.variables]
+        if unknown_vars:
+            raise ValueError(f"Unknown variable(s): {', '.join(unknown_vars)}")
+
+        cube = self._cubes.get(grain)
+        if cube is None:
+            return pd.DataFrame()
+
+        mask = pd.Series(True, index=cube.index)
+        if country:
+            mask &= cube.index.get_level_values('country') == country
+        if city:
+            mask &= cube.index.get_level_values('city') == city
+        result = cube.loc[mask.to_numpy(), pd.MultiIndex.from_product([variables, aggs])]
+
+        if window and not result.empty:
+            # Roll before trimming the date range so the first periods still see their history
+            result = (
+                result.groupby(level=PARTITION_COLUMNS, observed=True, sort=False)
+                .rolling(window, min_periods=1).mean()
+                .droplevel([0, 1])
+            )
+
+        periods = result.index.get_level_values('period')
+        keep = pd.Series(True, index=result.index)
+        if start_date:
+            keep &= periods >= period_start(pd.Timestamp(start_date), grain)
+        if end_date:
+            keep &= periods <= pd.Timestamp(end_date)
+        return result[keep.to_numpy()]
+
+    def to_series(self, result: pd.DataFrame) -> list:
+        """Columnar JSON shape: one entry per city with a value list per variable and aggregation."""
+        series = []
+        if result.empty:
+            return series
+        for (country, city), group in result.groupby(level=PARTITION_COLUMNS, observed=True, sort=False):
+            entry = {
+                "country": country,
+                "city": city,
+                "period": group.index.get_level_values('period').strftime('%Y-%m-%d').tolist(),
+            }
+            for variable, agg in group.columns:
+                values = group[(variable, agg)].astype(float).tolist()
+                # NaN (e.g. std of a single reading) isn't valid JSON
+                entry.setdefault(variable, {})[agg] = [None if v != v else v for v in values]
+            series.append(entry)
+        return series
@@ -0,0 +1,112 @@
+import json
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:  # the stdlib encoder is used without orjson
+    HAVE_ORJSON = False
+
+from app.services.metrics import stage
+
+STREAM_CHUNK_ROWS = 2000
+
+
+def _column_values(series: pd.Series) -> list:
+    """JSON-ready Python values for one column, converted in a single vectorized pass."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # Ensure date format is string (ISO) for JSON serialization
+        return series.dt.strftime('%Y-%m-%d').tolist()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(object).tolist()
+    # Fill NaNs to avoid JSON errors
+    return series.fillna(0).tolist()
+
+
+def frame_columns(df: pd.DataFrame) -> dict:
+    return {col: _column_values(df[col]) for col in df.columns}
+
+
+def _column_array(series: pd.Series):
+    """Like _column_values, but numeric columns stay NumPy arrays for orjson to encode natively."""
+    if HAVE_ORJSON and isinstance(series.dtype, np.dtype) and series.dtype.kind in "biuf":
+        values = series.to_numpy()
+        if series.dtype.kind == "f":
+            values = np.nan_to_num(values, nan=0.0)
+        return np.ascontiguousarray(values)
+    return _column_values(series)
+
+
+def frame_to_columnar(df: pd.DataFrame) -> dict:
+    """{"columns": [...], "data": {column: [values]}}: one array per column instead of a dict per row."""
+    with stage("serialization"):
+        return {"columns": list(df.columns), "data": {col: _column_array(df[col]) for col in df.columns}}
+
+
+def frame_to_records(df: pd.DataFrame) -> list:
+    """Converts a frame into a list of row dicts for JSON responses."""
+    with stage("serialization"):
+        columns = frame_columns(df)
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def _encode_default(value):
+    if isinstance(value, np.ndarray):
+        # orjson only encodes contiguous arrays of native types itself
+        return value.tolist()
+    return jsonable_encoder(value)
+
+
+def dumps(content) -> bytes:
+    """Compact JSON bytes; orjson when installed (NumPy arrays included), else the stdlib encoder."""
+    if HAVE_ORJSON:
+        return orjson.dumps(content, default=_encode_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(jsonable_encoder(content, custom_encoder={np.ndarray: np.ndarray.tolist}),
+                      ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that skips FastAPI's jsonable_encoder pass and encodes with `dumps`.
+
+    Return it from an endpoint to bypass the default response handling; content
+    may contain NumPy arrays, e.g. from frame_to_columnar.
+    """
+
+    def render(self, content) -> bytes:
+        with stage("json_encode"):
+            return dumps(content)
+
+
+def _iter_row_chunks(df: pd.DataFrame, chunk_rows: int):
+    """Yields lists of encoded JSON rows, converting chunk_rows rows at a time."""
+    names = list(df.columns)
+    if HAVE_ORJSON:
+        encode = lambda row: orjson.dumps(row).decode()
+    else:
+        encode = json.JSONEncoder(separators=(',', ':')).encode
+    for start in range(0, len(df), chunk_rows):
+        # Timed per chunk; the time spent sending each chunk isn't serialization
+        with stage("serialization"):
+            columns = frame_columns(df.iloc[start:start + chunk_rows])
+            rows = [encode(dict(zip(names, row))) for row in zip(*columns.values())]
+        yield rows
+
+
+def iter_ndjson(df: pd.DataFrame, chunk_rows: int = STREAM_CHUNK_ROWS):
+    """Streams the frame as newline-delimited JSON, one row per line."""
+    for rows in _iter_row_chunks(df, chunk_rows):
+        yield ("\n".join(rows) + "\n").encode()
+
+
+def iter_json_array(df: pd.DataFrame, chunk_rows: int = STREAM_CHUNK_ROWS, key: str = "data"):
+    """Streams the frame as {"<key>": [...]}, the same shape as the buffered response."""
+    yield f'{{"{key}":['.encode()
+    first = True
+    for rows in _iter_row_chunks(df, chunk_rows):
+        yield (("" if first else ",") + ",".join(rows)).encode()
+        first = False
+    yield b']}'
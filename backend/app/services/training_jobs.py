@@ -0,0 +1,156 @@
+import os
+import glob
+import uuid
+import pickle
+import queue
+import logging
+import threading
+import multiprocessing
+from datetime import datetime, timezone
+
+from app.services.ml_service import ml_service, save_model, MODEL_PATH, TRAINING_DATASET
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_DIR = os.path.dirname(MODEL_PATH)
+TRAINING_N_JOBS = int(os.getenv("TRAINING_N_JOBS", "-1"))
+# Versioned model artifacts kept on disk, the serving one included; older ones are deleted
+KEEP_ARTIFACTS = int(os.getenv("TRAINING_KEEP_ARTIFACTS", "3"))
+# Finished jobs kept for GET /predict/train; the oldest are forgotten first
+KEEP_JOBS = int(os.getenv("TRAINING_KEEP_JOBS", "50"))
+
+
+class TrainingJobRunning(Exception):
+    """Raised when a training job is submitted while another one is still running."""
+
+
+def _run_training(dataset_name: str, artifact_path: str, n_estimators: int, n_jobs: int, events):
+    """Entry point of the training process. Reports progress and the result through `events`."""
+    from app.services.ml_service import fit_temperature_model, TRAINING_COLUMNS
+    from app.services.dataset_registry import dataset_registry
+
+    try:
+        dataset = dataset_registry.get(dataset_name)
+        if dataset is None:
+            raise FileNotFoundError(f"No data available for dataset {dataset_name}")
+        # Only the model's columns are read
+        data = dataset.scan(columns=TRAINING_COLUMNS)
+        model, accuracy = fit_temperature_model(
+            data, n_estimators=n_estimators, n_jobs=n_jobs,
+            progress=lambda fraction: events.put(("progress", fraction)),
+        )
+        save_model(model, artifact_path)
+        events.put(("done", {"accuracy": accuracy}))
+    except Exception as e:
+        events.put(("error", f"{type(e).__name__}: {e}"))
+
+
+def prune_artifacts(keep: int = KEEP_ARTIFACTS, directory: str = ARTIFACT_DIR):
+    """Deletes all but the `keep` newest model-<version>.pkl artifacts."""
+    # Versions start with a UTC timestamp, so names sort oldest first
+    artifacts = sorted(glob.glob(os.path.join(directory, "model-*.pkl")))
+    for path in artifacts[:max(0, len(artifacts) - max(1, keep))]:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning("Could not delete old model artifact %s: %s", path, e)
+
+
+class TrainingJobManager:
+    """Runs model training in a separate process, one job at a time.
+
+    Each job writes a versioned artifact (models/model-<version>.pkl) through a
+    temporary file and rename, promotes it to MODEL_PATH the same way, and then
+    swaps it into the serving MLService without a restart. Only the newest
+    KEEP_ARTIFACTS artifacts and KEEP_JOBS jobs are kept.
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._active = None
+        self._lock = threading.Lock()
+        self._ctx = multiprocessing.get_context("spawn")
+
+    def submit(self, n_estimators: int = 100, n_jobs: int = TRAINING_N_JOBS) -> dict:
+        with self._lock:
+            if self._active is not None:
+                raise TrainingJobRunning(f"Training job {self._active} is still running")
+            job_id = uuid.uuid4().hex[:12]
+            version = f"{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}-{job_id[:6]}"
+            job = {
+                "id": job_id,
+                "status": "queued",
+                "progress": 0.0,
+                "n_estimators": n_estimators,
+                "n_jobs": n_jobs,
+                "model_version": version,
+                "accuracy": None,
+                "error": None,
+                "submitted_at": datetime.now(timezone.utc),
+                "finished_at": None,
+            }
+            self._jobs[job_id] = job
+            self._active = job_id
+            # Jobs are in submission order and only the new one can be running
+            while len(self._jobs) > max(1, KEEP_JOBS):
+                del self._jobs[next(iter(self._jobs))]
+
+        threading.Thread(target=self._supervise, args=(job,), name=f"training-{job_id}", daemon=True).start()
+        return dict(job)
+
+    def _supervise(self, job: dict):
+        artifact_path = os.path.join(ARTIFACT_DIR, f"model-{job['model_version']}.pkl")
+        events = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_run_training,
+            args=(TRAINING_DATASET, artifact_path, job["n_estimators"], job["n_jobs"], events),
+            daemon=True,
+        )
+        try:
+            process.start()
+            job["status"] = "running"
+            outcome = None
+            while outcome is None:
+                try:
+                    kind, payload = events.get(timeout=1)
+                except queue.Empty:
+                    if not process.is_alive():
+                        outcome = ("error", f"Training process exited with code {process.exitcode}")
+                    continue
+                if kind == "progress":
+                    job["progress"] = round(payload, 3)
+                else:
+                    outcome = (kind, payload)
+            process.join()
+
+            kind, payload = outcome
+            if kind == "error":
+                raise RuntimeError(payload)
+
+            with open(artifact_path, 'rb') as file:
+                model = pickle.load(file)
+            # Promote the artifact, then swap the serving model reference
+            save_model(model, MODEL_PATH)
+            ml_service.swap_model(model, job["model_version"])
+            prune_artifacts()
+            job.update(status="succeeded", progress=1.0, accuracy=payload["accuracy"])
+            logger.info("Training job %s finished; serving model %s", job['id'], job['model_version'])
+        except Exception as e:
+            logger.error("Training job %s failed: %s", job['id'], e)
+            job.update(status="failed", error=str(e))
+        finally:
+            job["finished_at"] = datetime.now(timezone.utc)
+            with self._lock:
+                self._active = None
+
+    def get(self, job_id: str) -> dict | None:
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    def list(self) -> list[dict]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [dict(job) for job in jobs]
+
+
+training_jobs = TrainingJobManager()
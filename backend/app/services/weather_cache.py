@@ -0,0 +1,117 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+
+from app.services.weather_client import WeatherAPIError
+
+logger = logging.getLogger(__name__)
+
+CURRENT_TTL = float(os.getenv("WEATHER_CACHE_CURRENT_TTL", "120"))
+FORECAST_TTL = float(os.getenv("WEATHER_CACHE_FORECAST_TTL", "600"))
+NEGATIVE_TTL = float(os.getenv("WEATHER_CACHE_NEGATIVE_TTL", "300"))
+MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "1024"))
+
+
+def normalize_location(city: str, country: str):
+    return (city or "").strip().casefold(), (country or "").strip().casefold()
+
+
+class WeatherCache:
+    """Bounded LRU cache with per-entry TTLs and single-flight fetching.
+
+    Entries are keyed by (kind, city, country) with the location normalized, so
+    "London, UK" and " london , uk" share an entry. "City not found" responses are
+    cached negatively for NEGATIVE_TTL. Concurrent misses for the same key await
+    one shared upstream fetch instead of each issuing their own.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, negative_ttl: float = NEGATIVE_TTL):
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, value, error)
+        self._inflight: dict = {}
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _key(self, kind: str, city: str, country: str):
+        return (kind, *normalize_location(city, country))
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, ttl: float, value=None, error: Exception = None):
+        self._entries[key] = (time.monotonic() + ttl, value, error)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _fill(self, key, ttl: float, fetch):
+        try:
+            value = await fetch()
+        except WeatherAPIError as e:
+            if e.status_code == 404:
+                self._store(key, self.negative_ttl, error=e)
+            raise
+        else:
+            self._store(key, ttl, value=value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get_or_fetch(self, kind: str, city: str, country: str, ttl: float, fetch):
+        """Returns the cached value for the key or awaits `fetch()` to fill it.
+
+        Cached values are shared between callers and must not be mutated.
+        """
+        key = self._key(kind, city, country)
+
+        entry = self._lookup(key)
+        if entry is not None:
+            _, value, error = entry
+            if error is not None:
+                self.negative_hits += 1
+                raise error
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # A separate task so a cancelled caller doesn't cancel the fetch for everyone else
+            task = asyncio.ensure_future(self._fill(key, ttl, fetch))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "ttl_seconds": {"current": CURRENT_TTL, "forecast": FORECAST_TTL, "negative": self.negative_ttl},
+        }
+
+
+weather_cache = WeatherCache()
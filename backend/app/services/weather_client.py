@@ -0,0 +1,82 @@
+import os
+import httpx
+import logging
+from app.services.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+# Constants
+API_KEY = os.getenv("OPENWEATHER_API_KEY", 'd2a0b86d0e5883fad5d67f7002929b49')
+BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5")
+
+CONNECT_TIMEOUT = float(os.getenv("OPENWEATHER_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("OPENWEATHER_READ_TIMEOUT", "5"))
+MAX_CONNECTIONS = int(os.getenv("OPENWEATHER_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE = int(os.getenv("OPENWEATHER_MAX_KEEPALIVE", "20"))
+
+
+class WeatherAPIError(Exception):
+    """Raised when OpenWeatherMap returns an error or cannot be reached."""
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class WeatherClient:
+    """Async OpenWeatherMap client sharing one keep-alive connection pool."""
+
+    def __init__(self, base_url: str = BASE_URL, api_key: str = API_KEY):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created lazily so the pool is bound to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE),
+            )
+        return self._client
+
+    async def _get(self, path: str, city: str, country: str, stage_name: str) -> dict:
+        # Use params for safe URL encoding
+        params = {
+            "q": f"{city},{country}",
+            "appid": self.api_key,
+            "units": "metric"
+        }
+        try:
+            with stage(stage_name):
+                response = await self._get_client().get(path, params=params)
+        except httpx.TimeoutException:
+            raise WeatherAPIError("Weather provider timed out")
+        except httpx.HTTPError as e:
+            raise WeatherAPIError(f"Weather provider unreachable: {e}")
+
+        logger.debug("OpenWeatherMap %s for %s, %s: %s", path, city, country, response.status_code)
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+
+        if response.status_code != 200:
+            raise WeatherAPIError(payload.get('message', 'Unknown error'), status_code=response.status_code)
+        return payload
+
+    async def fetch_current(self, city: str, country: str) -> dict:
+        return await self._get("/weather", city, country, "upstream_weather")
+
+    async def fetch_forecast(self, city: str, country: str) -> dict:
+        return await self._get("/forecast", city, country, "upstream_forecast")
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+weather_client = WeatherClient()
@@ -0,0 +1,78 @@
+"""Event-loop latency for other requests during a burst of logins.
+
+Run from backend/:  python -m benchmarks.auth_storm --logins 64
+
+A ticker coroutine stands in for the rest of the API: every interval it
+measures how late the event loop woke it up. The storm is run twice, once with
+bcrypt called inline (as the auth router used to) and once through the bounded
+auth worker pool.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.auth.security import PasswordHasher, AuthWorkersSaturated, get_password_hash, verify_password
+
+
+async def _ticker(stop: asyncio.Event, interval: float, lags: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def _inline_login(password, hashed):
+    return verify_password(password, hashed)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _storm(login, logins: int, interval: float) -> dict:
+    stop = asyncio.Event()
+    lags = []
+    ticker = asyncio.create_task(_ticker(stop, interval, lags))
+    await asyncio.sleep(interval * 3)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+    lags_ms = [lag * 1000 for lag in lags] or [0.0]
+    return {
+        "logins": logins,
+        "rejected": sum(isinstance(r, AuthWorkersSaturated) for r in results),
+        "storm_seconds": round(elapsed, 3),
+        "loop_lag_p50_ms": round(statistics.median(lags_ms), 2),
+        "loop_lag_p99_ms": round(_percentile(lags_ms, 99), 2),
+        "loop_lag_max_ms": round(max(lags_ms), 2),
+    }
+
+
+async def main(logins: int, workers: int, max_pending: int, interval: float):
+    password = "benchmark-password"
+    hashed = get_password_hash(password)
+    hasher = PasswordHasher(workers=workers, max_pending=max_pending)
+
+    before = await _storm(lambda: _inline_login(password, hashed), logins, interval)
+    after = await _storm(lambda: hasher.verify(password, hashed), logins, interval)
+
+    print(f"{'':10}{'storm s':>10}{'rejected':>10}{'lag p50 ms':>12}{'lag p99 ms':>12}{'lag max ms':>12}")
+    for label, result in (("inline", before), ("pooled", after)):
+        print(f"{label:10}{result['storm_seconds']:>10}{result['rejected']:>10}"
+              f"{result['loop_lag_p50_ms']:>12}{result['loop_lag_p99_ms']:>12}{result['loop_lag_max_ms']:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--interval-ms", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.workers, args.max_pending, args.interval_ms / 1000))
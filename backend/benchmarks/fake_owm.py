@@ -0,0 +1,87 @@
+"""Local stand-in for the OpenWeatherMap /weather and /forecast endpoints.
+
+Run from backend/:  python -m benchmarks.fake_owm --port 9100 --latency-ms 80 --jitter-ms 20
+
+Responses are deterministic per city, so repeated runs see the same payloads;
+only the added latency is random (seeded).
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+def _city_temperature(query: str) -> float:
+    # Stable per city, spread over -5..40°C so every alert colour shows up
+    digest = hashlib.sha256(query.lower().encode()).digest()
+    return round(-5 + digest[0] / 255 * 45, 2)
+
+
+def create_app(latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0) -> Starlette:
+    rng = random.Random(seed)
+    stats = {"requests": 0, "errors": 0}
+
+    async def delay():
+        stats["requests"] += 1
+        wait = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+        if wait:
+            await asyncio.sleep(wait)
+
+    def failed() -> JSONResponse | None:
+        if error_rate and rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"cod": 500, "message": "Injected failure"}, status_code=500)
+        return None
+
+    async def weather(request: Request):
+        await delay()
+        query = request.query_params.get("q", "")
+        if not query:
+            return JSONResponse({"cod": "400", "message": "Nothing to geocode"}, status_code=400)
+        temp = _city_temperature(query)
+        return failed() or JSONResponse({
+            "name": query.split(",")[0],
+            "main": {"temp": temp, "humidity": 60, "pressure": 1012},
+            "wind": {"speed": 4.1},
+            "weather": [{"main": "Clear", "description": "clear sky"}],
+            "dt": int(time.time()),
+        })
+
+    async def forecast(request: Request):
+        await delay()
+        query = request.query_params.get("q", "")
+        temp = _city_temperature(query)
+        now = int(time.time())
+        return failed() or JSONResponse({
+            "list": [{"dt": now + 3 * 3600 * i, "main": {"temp": round(temp + 0.3 * i, 2)}} for i in range(40)],
+        })
+
+    async def stats_route(request: Request):
+        return JSONResponse(stats)
+
+    return Starlette(routes=[
+        Route("/weather", weather),
+        Route("/forecast", forecast),
+        Route("/_stats", stats_route),
+    ])
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.seed),
+                host=args.host, port=args.port, log_level="warning")
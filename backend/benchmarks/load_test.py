@@ -0,0 +1,291 @@
+"""Reproducible load test of the main API routes against local stand-ins.
+
+Run from backend/:
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.load_test --concurrency 1,8,32 --duration 10
+
+Starts the fake OpenWeatherMap server (benchmarks/fake_owm.py) and the API
+backed by the Mongo stand-in (benchmarks/serve.py) as subprocesses, seeds a
+user and some climate readings, then drives each scenario at each concurrency
+level with a closed loop of clients. Reports p50/p95/p99 latency, throughput,
+error counts and the API process's peak RSS, and writes everything as JSON
+(benchmarks/results/ by default).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+DATASET_CITIES = [("Karachi", "Pakistan"), ("New York", "United States"), ("London", "United Kingdom"),
+                  ("Tokyo", "Japan"), ("Sydney", "Australia")]
+BENCH_USER = {"username": "bench", "email": "bench@example.com", "password": "bench-password"}
+SEED_READINGS = 5000
+
+
+def _predict(rng, options):
+    return "POST", "/predict/", {"json": {"city": f"City{rng.randrange(options.predict_cities)}", "country": "XX"}}
+
+
+def _analytics_correlation(rng, options):
+    city, country = rng.choice(DATASET_CITIES)
+    return "GET", "/analytics/correlation", {"params": {"city": city, "country": country}}
+
+
+def _analytics_comparison(rng, options):
+    city, country = rng.choice(DATASET_CITIES)
+    variables = rng.sample(["temperature", "humidity", "co2_levels", "rainfall", "wind_speed"], 2)
+    return "POST", "/analytics/comparison", {"json": {"variables": variables, "city": city, "country": country,
+                                                      "max_points": 1000}}
+
+
+def _analytics_data(rng, options):
+    city, country = rng.choice(DATASET_CITIES)
+    return "GET", "/analytics/data", {"params": {"city": city, "country": country}}
+
+
+def _system_stats(rng, options):
+    return "GET", "/system/stats", {}
+
+
+def _auth_token(rng, options):
+    return "POST", "/auth/token", {"data": {"username": BENCH_USER["username"], "password": BENCH_USER["password"]}}
+
+
+def _climate_list(rng, options):
+    city, _ = rng.choice(DATASET_CITIES)
+    return "GET", "/climate/", {"params": {"location": city, "limit": 100}}
+
+
+SCENARIOS = {
+    "predict": _predict,
+    "analytics_correlation": _analytics_correlation,
+    "analytics_comparison": _analytics_comparison,
+    "analytics_data": _analytics_data,
+    "system_stats": _system_stats,
+    "auth_token": _auth_token,
+    "climate_list": _climate_list,
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _rss_kb(pid: int, field: str = "VmRSS") -> int | None:
+    """Resident set size from /proc (Linux); None where that isn't available."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _percentile(ordered: list[float], pct: float) -> float | None:
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+async def _wait_until(url: str, timeout: float, ok=(200,)):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code in ok:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout:.0f}s")
+
+
+async def _seed(client: httpx.AsyncClient, rng: random.Random):
+    await client.post("/auth/register", json=BENCH_USER)
+    readings = [{
+        "temperature": round(rng.uniform(-5, 40), 1),
+        "humidity": round(rng.uniform(20, 100), 1),
+        "co2_level": round(rng.uniform(400, 440), 1),
+        "timestamp": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00",
+        "location": rng.choice(DATASET_CITIES)[0],
+    } for _ in range(SEED_READINGS)]
+    response = await client.post("/climate/bulk", json=readings)
+    response.raise_for_status()
+
+
+async def run_level(client: httpx.AsyncClient, scenario: str, concurrency: int, duration: float,
+                    seed: int, options, server_pid: int) -> dict:
+    make_request = SCENARIOS[scenario]
+    latencies, statuses, failures = [], {}, 0
+    peak_rss = 0
+    stop_at = time.perf_counter() + duration
+
+    async def worker(worker_id: int):
+        nonlocal failures
+        rng = random.Random(f"{seed}-{scenario}-{concurrency}-{worker_id}")
+        while time.perf_counter() < stop_at:
+            method, path, kwargs = make_request(rng, options)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                await response.aread()
+            except httpx.HTTPError:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def sample_rss():
+        nonlocal peak_rss
+        while time.perf_counter() < stop_at:
+            peak_rss = max(peak_rss, _rss_kb(server_pid) or 0)
+            await asyncio.sleep(0.1)
+
+    started = time.perf_counter()
+    await asyncio.gather(sample_rss(), *(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": failures + sum(count for code, count in statuses.items() if code >= 400),
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "p50": ms(_percentile(ordered, 50)),
+            "p95": ms(_percentile(ordered, 95)),
+            "p99": ms(_percentile(ordered, 99)),
+            "max": ms(ordered[-1] if ordered else None),
+        },
+        "peak_rss_mb": round(peak_rss / 1024, 1) if peak_rss else None,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(options):
+    owm_port, api_port = _free_port(), _free_port()
+    env = {
+        **os.environ,
+        "OPENWEATHER_BASE_URL": f"http://127.0.0.1:{owm_port}",
+        "OPENWEATHER_API_KEY": "benchmark",
+        "CHART_CACHE_DIR": os.path.join(RESULTS_DIR, ".chart-cache"),
+    }
+    processes = [
+        subprocess.Popen([sys.executable, "-m", "benchmarks.fake_owm", "--port", str(owm_port),
+                          "--latency-ms", str(options.owm_latency_ms), "--jitter-ms", str(options.owm_jitter_ms),
+                          "--seed", str(options.seed)], cwd=BACKEND_DIR, env=env),
+        subprocess.Popen([sys.executable, "-m", "benchmarks.serve", "--port", str(api_port)],
+                         cwd=BACKEND_DIR, env=env),
+    ]
+    server = processes[1]
+    base_url = f"http://127.0.0.1:{api_port}"
+    results = []
+    try:
+        await _wait_until(f"http://127.0.0.1:{owm_port}/_stats", 30)
+        await _wait_until(f"{base_url}/system/ready", 120)
+
+        max_concurrency = max(options.concurrency)
+        limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=options.timeout) as client:
+            await _seed(client, random.Random(options.seed))
+            for scenario in options.scenarios:
+                for concurrency in options.concurrency:
+                    result = await run_level(client, scenario, concurrency, options.duration,
+                                             options.seed, options, server.pid)
+                    results.append(result)
+                    latency = result["latency_ms"]
+                    print(f"{scenario:24}{concurrency:>5}{result['requests']:>8}{result['errors']:>7}"
+                          f"{result['throughput_rps']:>10}{latency['p50']!s:>9}{latency['p95']!s:>9}"
+                          f"{latency['p99']!s:>9}{result['peak_rss_mb']!s:>9}", flush=True)
+        server_peak = _rss_kb(server.pid, "VmHWM")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+
+    report = {
+        "started_at": options.started_at,
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "duration_s": options.duration,
+            "concurrency": options.concurrency,
+            "seed": options.seed,
+            "owm_latency_ms": options.owm_latency_ms,
+            "owm_jitter_ms": options.owm_jitter_ms,
+            "predict_cities": options.predict_cities,
+            "seed_readings": SEED_READINGS,
+        },
+        "server_peak_rss_mb": round(server_peak / 1024, 1) if server_peak else None,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(options.output), exist_ok=True)
+    with open(options.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nWrote {options.output}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per scenario and level")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--owm-latency-ms", type=float, default=80)
+    parser.add_argument("--owm-jitter-ms", type=float, default=20)
+    parser.add_argument("--predict-cities", type=int, default=200,
+                        help="Distinct cities requested by the predict scenario (more means more cache misses)")
+    parser.add_argument("--output", default=None, help="Results file; defaults to benchmarks/results/load_test-<time>.json")
+    options = parser.parse_args(argv)
+
+    options.scenarios = [s.strip() for s in options.scenarios.split(",") if s.strip()]
+    unknown = [s for s in options.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+    options.concurrency = [int(c) for c in options.concurrency.split(",")]
+    now = datetime.now(timezone.utc)
+    options.started_at = now.isoformat()
+    options.output = options.output or os.path.join(RESULTS_DIR, f"load_test-{now.strftime('%Y%m%d-%H%M%S')}.json")
+    return options
+
+
+if __name__ == "__main__":
+    options = parse_args()
+    print(f"{'scenario':24}{'conc':>5}{'reqs':>8}{'errors':>7}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'p99 ms':>9}{'rss MB':>9}")
+    asyncio.run(main(options))
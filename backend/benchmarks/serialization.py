@@ -0,0 +1,108 @@
+"""Encode time and response size of /analytics/data payloads.
+
+Run from backend/:  python -m benchmarks.serialization [--city Karachi] [--rows 0] [--repeat 20] [--json]
+
+Compares FastAPI's default path (jsonable_encoder + stdlib json over row
+dicts) with FastJSONResponse over the same rows and over the columnar format,
+then compresses each payload with gzip and brotli at the configured levels.
+Times include turning the frame into the payload, as the endpoint does.
+"""
+import argparse
+import json
+import statistics
+import time
+
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.services import compression
+from app.services.dataset_registry import dataset_registry
+from app.services.serialization import FastJSONResponse, HAVE_ORJSON, frame_to_columnar, frame_to_records
+
+
+def _stdlib_records(df: pd.DataFrame) -> bytes:
+    return JSONResponse(jsonable_encoder({"data": frame_to_records(df)})).body
+
+
+def _fast_records(df: pd.DataFrame) -> bytes:
+    return FastJSONResponse({"data": frame_to_records(df)}).body
+
+
+def _fast_columns(df: pd.DataFrame) -> bytes:
+    return FastJSONResponse(frame_to_columnar(df)).body
+
+
+ENCODERS = {
+    "stdlib records": _stdlib_records,
+    "fast records": _fast_records,
+    "fast columns": _fast_columns,
+}
+
+
+def _time(fn, repeat: int) -> tuple[float, object]:
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def load_frame(city: str | None, rows: int) -> pd.DataFrame:
+    dataset = dataset_registry.get("climate")
+    if dataset is None:
+        raise SystemExit("No climate dataset found; generate one with scripts/generate_global_data.py")
+    df = dataset.scan(city=city)
+    if "date" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["date"]):
+        df = df.assign(date=pd.to_datetime(df["date"]))
+    return df.head(rows) if rows else df
+
+
+def run(df: pd.DataFrame, repeat: int) -> list[dict]:
+    results = []
+    for name, encoder in ENCODERS.items():
+        seconds, body = _time(lambda: encoder(df), repeat)
+        result = {"encoder": name, "encode_ms": round(seconds * 1000, 2), "bytes": len(body), "compressed": {}}
+        for encoding in compression.supported_encodings():
+            seconds, compressed = _time(lambda: compression.compress(body, encoding), repeat)
+            result["compressed"][encoding] = {
+                "compress_ms": round(seconds * 1000, 2),
+                "bytes": len(compressed),
+                "saved_pct": round(100 * (1 - len(compressed) / len(body)), 1),
+            }
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--city", default=None, help="Only this city's rows (default: the whole dataset)")
+    parser.add_argument("--rows", type=int, default=0, help="Use the first N rows; 0 uses all of them")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement; the median is reported")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    df = load_frame(args.city, args.rows)
+    results = run(df, args.repeat)
+    if args.json:
+        print(json.dumps({"rows": len(df), "orjson": HAVE_ORJSON, "brotli": compression.HAVE_BROTLI,
+                          "gzip_level": compression.GZIP_LEVEL, "brotli_quality": compression.BROTLI_QUALITY,
+                          "results": results}, indent=2))
+        return
+
+    baseline = results[0]
+    print(f"{len(df)} rows; orjson {'on' if HAVE_ORJSON else 'off'}, gzip level {compression.GZIP_LEVEL}"
+          + (f", brotli quality {compression.BROTLI_QUALITY}" if compression.HAVE_BROTLI else ", brotli not installed"))
+    print(f"{'encoder':16}{'encode ms':>11}{'speedup':>9}{'bytes':>12}"
+          + "".join(f"{encoding + ' bytes':>13}{'ms':>8}{'saved':>8}" for encoding in compression.supported_encodings()))
+    for result in results:
+        speedup = baseline["encode_ms"] / result["encode_ms"] if result["encode_ms"] else float("inf")
+        line = f"{result['encoder']:16}{result['encode_ms']:>11}{speedup:>8.1f}x{result['bytes']:>12}"
+        for stats in result["compressed"].values():
+            line += f"{stats['bytes']:>13}{stats['compress_ms']:>8}{stats['saved_pct']:>7}%"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Runs the API against an in-memory Mongo stand-in (mongomock-motor).
+
+Run from backend/:  OPENWEATHER_BASE_URL=http://127.0.0.1:9100 python -m benchmarks.serve --port 8100
+
+Everything else is the real application; only the Motor client class is
+swapped before the lifespan connects.
+"""
+import argparse
+
+import uvicorn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--real-mongo", action="store_true", help="Use MONGO_DETAILS instead of the stand-in")
+    args = parser.parse_args()
+
+    if not args.real_mongo:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("The Mongo stand-in needs mongomock-motor: pip install -r benchmarks/requirements.txt")
+        import app.database
+        app.database.AsyncIOMotorClient = AsyncMongoMockClient
+
+    import main as api
+    uvicorn.run(api.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
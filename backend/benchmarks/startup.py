@@ -0,0 +1,85 @@
+"""Startup cost of the API, broken down per module.
+
+Run from backend/:  python -m benchmarks.startup [--top 15] [--json]
+
+Each measurement runs in a fresh interpreter. Import cost comes from
+`python -X importtime -c "import main"`; load cost is the time to build each
+lazily-initialized service after the import.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_LOAD_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter() - started
+from app.services.lazy import registry
+loads = {}
+for name, service in registry.items():
+    t = time.perf_counter()
+    service.get()
+    loads[name] = time.perf_counter() - t
+print(json.dumps({"import_main": imported, "loads": loads}))
+"""
+
+
+def _run(args: list[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+
+
+def import_times() -> list[dict]:
+    """Self and cumulative import time (seconds) of every module imported by main."""
+    result = _run(["-X", "importtime", "-c", "import main"])
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "self": int(self_us) / 1e6,
+            "cumulative": int(cumulative_us) / 1e6,
+        })
+    return modules
+
+
+def load_times() -> dict:
+    result = _run(["-c", _LOAD_SCRIPT])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(top: int, as_json: bool):
+    modules = import_times()
+    loads = load_times()
+    app_modules = [m for m in modules if m["module"] == "main" or m["module"].startswith("app.")]
+    heaviest = sorted(modules, key=lambda m: m["self"], reverse=True)[:top]
+
+    if as_json:
+        print(json.dumps({"import_main": loads["import_main"], "service_loads": loads["loads"],
+                          "app_modules": app_modules, "heaviest_modules": heaviest}, indent=2))
+        return
+
+    print(f"import main: {loads['import_main']:.3f}s")
+    print("\nService load (first use):")
+    for name, seconds in loads["loads"].items():
+        print(f"  {name:30}{seconds:>8.3f}s")
+    print("\nApp modules (cumulative import time):")
+    for m in sorted(app_modules, key=lambda m: m["cumulative"], reverse=True):
+        print(f"  {m['module']:45}{m['cumulative']:>8.3f}s")
+    print(f"\nHeaviest {top} modules (self time):")
+    for m in heaviest:
+        print(f"  {m['module']:45}{m['self']:>8.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+    main(args.top, args.json)
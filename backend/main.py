@@ -2,13 +2,48 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import climate, prediction, analytics, auth, feedback, notifications, system
 
+import os
+import asyncio
+import logging
 from contextlib import asynccontextmanager
-from app.database import connect_to_mongo, close_mongo_connection
+from app.database import connect_to_mongo, close_mongo_connection, ensure_indexes
+from app.services.weather_client import weather_client
+from app.services.render_pool import render_pool
+from app.services.notification_service import notification_service
+from app.services.lazy import warm_up
+from app.services.dataset_registry import dataset_registry
+from app.services.metrics import MetricsMiddleware
+from app.services.compression import CompressionMiddleware
+from app.services.profiling import ProfilingMiddleware, profiling_enabled
+
+# Build the ML and analytics services in the background at startup instead of on first request
+SERVICE_WARMUP = os.getenv("SERVICE_WARMUP", "1") == "1"
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+# httpx logs every request URL at INFO, and OpenWeatherMap URLs carry the API key
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await connect_to_mongo()
+    # Alerts raised on worker threads are delivered on this loop
+    notification_service.bind_loop()
+    # In the background so an unreachable Mongo doesn't hold up startup
+    index_task = asyncio.create_task(ensure_indexes())
+    if SERVICE_WARMUP:
+        # Readiness is reported at /system/ready while this runs
+        asyncio.get_running_loop().run_in_executor(None, warm_up)
+    # Reload datasets in the background when their files change
+    dataset_registry.start_watching()
     yield
+    dataset_registry.stop_watching()
+    index_task.cancel()
+    await weather_client.aclose()
+    render_pool.shutdown()
     await close_mongo_connection()
 
 app = FastAPI(lifespan=lifespan)
@@ -21,7 +56,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Profile-Id"],
 )
+app.add_middleware(CompressionMiddleware)
+# Not installed at all unless PROFILING_TOKEN is set
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
+# Outermost, so latency includes CORS handling and the whole response body
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router, tags=["Authentication"], prefix="/auth")
 app.include_router(climate.router, tags=["Climate"], prefix="/climate")
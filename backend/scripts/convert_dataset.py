@@ -0,0 +1,44 @@
+"""Converts the CSV or Parquet datasets into memory-mapped Arrow storage.
+
+    python scripts/convert_dataset.py              # every registered dataset
+    python scripts/convert_dataset.py climate      # just the global dataset
+
+Output goes to data/columnar/<dataset>/, partitioned by country and city. A
+running API switches to it on its next dataset poll; the source file stays in
+place as the fallback and is used again if it is edited after the conversion.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.columnar_store import HAVE_ARROW
+from app.services.dataset_registry import dataset_registry
+
+
+def main(argv=None):
+    names = dataset_registry.names()
+    parser = argparse.ArgumentParser(description="Convert CSV or Parquet datasets to partitioned Arrow IPC files.")
+    parser.add_argument("datasets", nargs="*", metavar="dataset",
+                        help=f"Datasets to convert: {', '.join(names)} (default: all)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.datasets if name not in names]
+    if unknown:
+        parser.error(f"Unknown datasets: {', '.join(unknown)}")
+    if not HAVE_ARROW:
+        sys.exit("Columnar storage needs pyarrow: pip install pyarrow")
+
+    for name in args.datasets or names:
+        started = time.perf_counter()
+        try:
+            manifest = dataset_registry.convert(name)
+        except FileNotFoundError as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        print(f"Converted {name} in {time.perf_counter() - started:.2f}s -> {os.path.dirname(manifest)}")
+
+
+if __name__ == "__main__":
+    main()
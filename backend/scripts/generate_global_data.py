@@ -1,9 +1,27 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+"""Generates the synthetic global climate dataset.
+
+    python scripts/generate_global_data.py                       # the 5 reference cities, 2020-2025, CSV
+    python scripts/generate_global_data.py --cities 5000 --start 1990-01-01 --end 2025-12-31 \\
+        --format parquet --output data/global_climate_data.parquet
+
+Rows are produced a block of cities at a time and appended to the output, so
+memory stays flat however many cities or days are requested. Every city draws
+from its own random stream derived from --seed, so a city's readings depend
+only on the seed, the city and the date range, not on --chunk-rows.
+
+The API loads data/global_climate_data.parquet in preference to the CSV when
+it exists, and scripts/convert_dataset.py converts either one.
+"""
+import argparse
 import os
+import sys
+import numpy as np
+import pandas as pd
 
-# Configuration
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLUMNS = ["date", "temperature", "humidity", "co2_levels", "city", "country", "wind_speed", "rainfall", "pressure"]
+
+# Reference cities; any further cities requested with --cities are synthesized from the seed
 CITIES = [
     {"city": "Karachi", "country": "Pakistan", "lat": 24.86, "base_temp": 26, "temp_var": 8, "humidity_base": 70, "co2_base": 420},
     {"city": "New York", "country": "United States", "lat": 40.71, "base_temp": 13, "temp_var": 15, "humidity_base": 65, "co2_base": 415},
@@ -11,67 +29,177 @@ CITIES = [
     {"city": "Tokyo", "country": "Japan", "lat": 35.67, "base_temp": 16, "temp_var": 10, "humidity_base": 60, "co2_base": 418},
     {"city": "Sydney", "country": "Australia", "lat": -33.86, "base_temp": 18, "temp_var": 6, "humidity_base": 65, "co2_base": 410}
 ]
+SYNTHETIC_COUNTRIES = 50
+
+# Streams of SeedSequence([seed, stream, city_index])
+_CITY_STREAM = 0
+_READINGS_STREAM = 1
+
+
+def city_profile(index: int, seed: int) -> dict:
+    if index < len(CITIES):
+        return CITIES[index]
+    rng = np.random.default_rng([seed, _CITY_STREAM, index])
+    lat = rng.uniform(-55, 65)
+    return {
+        "city": f"City {index:05d}",
+        "country": f"Country {index % SYNTHETIC_COUNTRIES:02d}",
+        "lat": lat,
+        # Warmer and less seasonal towards the equator
+        "base_temp": 28 - 0.3 * abs(lat) + rng.normal(0, 2),
+        "temp_var": 3 + 0.2 * abs(lat),
+        "humidity_base": rng.uniform(50, 85),
+        "co2_base": rng.uniform(405, 425),
+    }
+
+
+def date_axis(start: str, end: str):
+    """Dates from start to end inclusive, with day-of-year and years since start."""
+    dates = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    if len(dates) == 0:
+        raise ValueError("--end must not be before --start")
+    day_of_year = (dates - dates.astype("datetime64[Y]")).astype(np.int64) + 1
+    years_passed = (dates - dates[0]).astype(np.int64) / 365
+    return dates, day_of_year, years_passed
+
+
+def generate_block(profiles: list[dict], indices: range, seed: int, dates, day_of_year, years_passed) -> pd.DataFrame:
+    """Readings for a block of cities, computed as (cities x days) arrays."""
+    n_cities, n_days = len(profiles), len(dates)
+    shape = (n_cities, n_days)
+
+    def column(key):
+        return np.array([p[key] for p in profiles], dtype=np.float64)[:, None]
+
+    # One independent stream per city keeps output identical whatever the block size
+    noise = {name: np.empty(shape) for name in ("temp", "humidity", "co2", "wind", "rain_draw", "rain_amount", "pressure")}
+    for row, index in enumerate(indices):
+        rng = np.random.default_rng([seed, _READINGS_STREAM, index])
+        noise["temp"][row] = rng.normal(0, 3, n_days)
+        noise["humidity"][row] = rng.normal(0, 10, n_days)
+        noise["co2"][row] = rng.normal(0, 2, n_days)
+        noise["wind"][row] = rng.lognormal(2.5, 0.4, n_days)
+        noise["rain_draw"][row] = rng.random(n_days)
+        noise["rain_amount"][row] = rng.exponential(5, n_days)
+        noise["pressure"][row] = rng.normal(0, 5, n_days)
+
+    # Summer peaks mid-year in the northern hemisphere and at the turn of the year in the southern
+    hemisphere = np.where(column("lat") > 0, -1.0, 1.0)
+    seasonality = hemisphere * np.cos(2 * np.pi * day_of_year / 365)[None, :]
+
+    temps = column("base_temp") + column("temp_var") * seasonality + noise["temp"]
+    # Humidity runs roughly inverse to temperature
+    humidity = np.clip(column("humidity_base") - 5 * seasonality + noise["humidity"], 20, 100)
+    # Urban baseline plus a rising global trend (about 2.5 ppm/year)
+    co2 = column("co2_base") + 2.5 * years_passed[None, :] + noise["co2"]
+    # Rain is more likely on humid days
+    rain_prob = np.clip((humidity - 50) / 100, 0, 1)
+    rainfall = np.where(noise["rain_draw"] < rain_prob * 0.3, noise["rain_amount"], 0.0)
+    pressure = 1013 - (temps - 15) / 2 + noise["pressure"]
+
+    cities = pd.Categorical.from_codes(np.repeat(np.arange(n_cities), n_days), [p["city"] for p in profiles])
+    countries = np.repeat(np.array([p["country"] for p in profiles], dtype=object), n_days)
+    return pd.DataFrame({
+        "date": np.tile(dates, n_cities),
+        "temperature": temps.ravel().round(1),
+        "humidity": humidity.ravel().round(0),
+        "co2_levels": co2.ravel().round(1),
+        "city": cities,
+        "country": countries,
+        "wind_speed": noise["wind"].ravel().round(1),
+        "rainfall": rainfall.ravel().round(1),
+        "pressure": pressure.ravel().round(0),
+    }, columns=COLUMNS)
+
+
+class CsvWriter:
+    def __init__(self, path: str):
+        self.file = open(path, "w", newline="")
+        self.header = True
+
+    def write(self, frame: pd.DataFrame):
+        frame.to_csv(self.file, index=False, header=self.header, date_format="%Y-%m-%d")
+        self.header = False
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Writes each block as a row group with typed columns."""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("Parquet output needs pyarrow: pip install pyarrow")
+        self.pa = pa
+        self.schema = pa.schema([
+            ("date", pa.date32()),
+            ("temperature", pa.float64()),
+            ("humidity", pa.float64()),
+            ("co2_levels", pa.float64()),
+            ("city", pa.dictionary(pa.int32(), pa.string())),
+            ("country", pa.dictionary(pa.int32(), pa.string())),
+            ("wind_speed", pa.float64()),
+            ("rainfall", pa.float64()),
+            ("pressure", pa.float64()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write(self, frame: pd.DataFrame):
+        frame = frame.assign(country=frame["country"].astype("category"))
+        table = self.pa.Table.from_pandas(frame, preserve_index=False).cast(self.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+
+
+def generate(output: str, n_cities: int, start: str, end: str, seed: int, fmt: str, chunk_rows: int) -> int:
+    dates, day_of_year, years_passed = date_axis(start, end)
+    # Whole cities per block; a single city's full date range is the smallest block
+    cities_per_block = max(1, chunk_rows // len(dates))
+    writer = ParquetWriter(output) if fmt == "parquet" else CsvWriter(output)
+    rows = 0
+    try:
+        for first in range(0, n_cities, cities_per_block):
+            indices = range(first, min(first + cities_per_block, n_cities))
+            profiles = [city_profile(i, seed) for i in indices]
+            frame = generate_block(profiles, indices, seed, dates, day_of_year, years_passed)
+            writer.write(frame)
+            rows += len(frame)
+    finally:
+        writer.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the synthetic global climate dataset.")
+    parser.add_argument("--cities", type=int, default=len(CITIES),
+                        help=f"Number of cities; the first {len(CITIES)} are the reference cities")
+    parser.add_argument("--start", default="2020-01-01", help="First date (YYYY-MM-DD)")
+    parser.add_argument("--end", default="2025-12-31", help="Last date, inclusive (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None,
+                        help="Output format; inferred from the --output extension when omitted")
+    parser.add_argument("--output", default=None, help="Defaults to data/global_climate_data.<format>")
+    parser.add_argument("--chunk-rows", type=int, default=500_000, help="Approximate rows held in memory at once")
+    args = parser.parse_args(argv)
+
+    if args.cities < 1:
+        parser.error("--cities must be at least 1")
+    fmt = args.format or ("parquet" if args.output and args.output.endswith(".parquet") else "csv")
+    output = args.output or os.path.join(BASE_DIR, "data", f"global_climate_data.{fmt}")
+
+    print(f"Generating data from {args.start} to {args.end} for {args.cities} cities (seed {args.seed})...")
+    try:
+        rows = generate(output, args.cities, args.start, args.end, args.seed, fmt, args.chunk_rows)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Successfully generated {rows} rows of data at {output}")
+
 
-START_DATE = datetime(2020, 1, 1)
-END_DATE = datetime(2025, 12, 31)
-DAYS = (END_DATE - START_DATE).days
-
-data = []
-
-print(f"Generating data from {START_DATE.date()} to {END_DATE.date()} ({DAYS} days) for {len(CITIES)} cities...")
-
-for city_info in CITIES:
-    dates = [START_DATE + timedelta(days=i) for i in range(DAYS)]
-    
-    # Generate seasonality (sine wave)
-    # Northern hemisphere peaks in mid-year (approx day 200), Southern in start/end (approx day 0/365)
-    day_of_year = np.array([d.timetuple().tm_yday for d in dates])
-    
-    if city_info["lat"] > 0:
-        seasonality = -np.cos(2 * np.pi * day_of_year / 365) # Peak in summer (June/July)
-    else:
-        seasonality = np.cos(2 * np.pi * day_of_year / 365) # Peak in summer (Dec/Jan)
-
-    # Temperature
-    temps = city_info["base_temp"] + (city_info["temp_var"] * seasonality) + np.random.normal(0, 3, DAYS)
-    
-    # Humidity (inverse to temp roughly + noise)
-    humidity = city_info["humidity_base"] - (5 * seasonality) + np.random.normal(0, 10, DAYS)
-    humidity = np.clip(humidity, 20, 100)
-    
-    # CO2 (Trend upward + random noise + seasonal oscillation)
-    # Industrial/Urban baseline + global rising trend (approx 2ppm/year)
-    years_passed = np.array([(d - START_DATE).days / 365 for d in dates])
-    co2 = city_info["co2_base"] + (2.5 * years_passed) + np.random.normal(0, 2, DAYS)
-    
-    # Wind Speed (Random lognormal)
-    wind = np.random.lognormal(2.5, 0.4, DAYS)
-    
-    # Rainfall (probabilistic based on humidity)
-    rain_prob = (humidity - 50) / 100
-    rain_prob = np.clip(rain_prob, 0, 1)
-    is_rain = np.random.rand(DAYS) < (rain_prob * 0.3)
-    rainfall = np.where(is_rain, np.random.exponential(5, DAYS), 0)
-    
-    # Pressure
-    pressure = 1013 - (temps - 15)/2 + np.random.normal(0, 5, DAYS)
-
-    for i in range(DAYS):
-        data.append({
-            "date": dates[i].strftime("%Y-%m-%d"),
-            "temperature": round(temps[i], 1),
-            "humidity": round(humidity[i], 0),
-            "co2_levels": round(co2[i], 1),
-            "city": city_info["city"],
-            "country": city_info["country"],
-            "wind_speed": round(wind[i], 1),
-            "rainfall": round(rainfall[i], 1),
-            "pressure": round(pressure[i], 0)
-        })
-
-df = pd.DataFrame(data)
-
-# Save to CSV
-output_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "global_climate_data.csv")
-df.to_csv(output_path, index=False)
-print(f"Successfully generated {len(df)} rows of data at {output_path}")
+if __name__ == "__main__":
+    main()
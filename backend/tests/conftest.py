@@ -0,0 +1,31 @@
+"""Run from backend/:  pip install -r requirements-dev.txt && python -m pytest tests"""
+import pytest
+import httpx
+from fastapi import FastAPI
+from mongomock_motor import AsyncMongoMockClient
+
+from app import database
+from app.routers import auth, climate, feedback
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """An in-memory Mongo stand-in behind app.database."""
+    monkeypatch.setattr(database.db, "client", AsyncMongoMockClient())
+    return database.get_database()
+
+
+@pytest.fixture
+async def client(mongo):
+    # Only the routers under test, so the analytics and ML services are never built
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+    app.include_router(climate.router, prefix="/climate")
+    app.include_router(feedback.router, prefix="/feedback")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from app.services import analytics_service as analytics_module
+from app.services.analytics_service import AnalyticsService
+from app.services.dataset_registry import DatasetRegistry
+
+
+@pytest.fixture
+def climate_csv(tmp_path):
+    rng = np.random.default_rng(7)
+    dates = pd.date_range("2023-01-01", "2023-06-30")
+    cities = [("Pakistan", "Karachi"), ("Pakistan", "Lahore"), ("Japan", "Tokyo")]
+    frames = []
+    for country, city in cities:
+        temperature = rng.normal(20, 5, len(dates))
+        frames.append(pd.DataFrame({
+            "date": dates.strftime("%Y-%m-%d"), "country": country, "city": city,
+            "temperature": temperature,
+            "humidity": 60 - temperature + rng.normal(0, 3, len(dates)),
+            "rainfall": np.where(rng.random(len(dates)) < 0.1, np.nan, rng.gamma(1, 2, len(dates))),
+        }))
+    path = tmp_path / "climate.csv"
+    pd.concat(frames).to_csv(path, index=False)
+    return path
+
+
+def _service(monkeypatch, path, columnar_dir, convert):
+    registry = DatasetRegistry()
+    registry.register("climate", str(path), columnar=str(columnar_dir))
+    if convert:
+        registry.convert("climate")
+    monkeypatch.setattr(analytics_module, "dataset_registry", registry)
+    return AnalyticsService()
+
+
+def test_columnar_service_matches_csv_without_loading_the_table(monkeypatch, climate_csv, tmp_path):
+    in_memory = _service(monkeypatch, climate_csv, tmp_path / "unused", convert=False)
+    columnar = _service(monkeypatch, climate_csv, tmp_path / "columnar", convert=True)
+    assert columnar.dataset.storage == "columnar"
+
+    for filters in ({}, {"country": "Pakistan"}, {"city": "Tokyo"}):
+        expected = in_memory.get_aggregates("week", ["mean", "count", "std"], **filters)
+        actual = columnar.get_aggregates("week", ["mean", "count", "std"], **filters)
+        assert [(e["country"], e["city"], e["period"]) for e in actual] == \
+               [(e["country"], e["city"], e["period"]) for e in expected]
+        for e, a in zip(expected, actual):
+            for variable in in_memory.rollups.variables:
+                for agg in e[variable]:
+                    np.testing.assert_allclose(np.array(a[variable][agg], float), np.array(e[variable][agg], float),
+                                               rtol=1e-9, equal_nan=True)
+
+        expected_corr = in_memory.get_correlation(**filters)
+        actual_corr = columnar.get_correlation(**filters).loc[expected_corr.index, expected_corr.columns]
+        np.testing.assert_allclose(actual_corr.to_numpy(), expected_corr.to_numpy(), atol=1e-10)
+
+    page, cursor = columnar.get_data_page(limit=50, city="Lahore")
+    assert len(page) == 50 and cursor is not None
+    assert len(columnar.get_data_frame(city="Karachi", start_date="2023-03-01")) == \
+           len(in_memory.get_data_frame(city="Karachi", start_date="2023-03-01"))
+
+    # Everything above was answered from scans and per-partition builds
+    assert columnar.store is None
+    assert columnar.dataset._frame is None
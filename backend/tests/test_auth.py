@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+from pymongo import ASCENDING
+
+pytestmark = pytest.mark.anyio
+
+USER = {"username": "ada", "email": "ada@example.com", "password": "correct-horse"}
+
+
+async def test_concurrent_registrations_of_one_username(client, mongo):
+    await mongo["users"].create_index([("username", ASCENDING)], unique=True)
+
+    responses = await asyncio.gather(*(client.post("/auth/register", json=USER) for _ in range(3)))
+
+    assert sorted(r.status_code for r in responses) == [200, 400, 400]
+    assert all(r.json()["detail"] == "Username already registered" for r in responses if r.status_code == 400)
+    assert await mongo["users"].count_documents({"username": "ada"}) == 1
+
+
+async def test_login_after_register(client):
+    assert (await client.post("/auth/register", json=USER)).status_code == 200
+
+    ok = await client.post("/auth/token", data={"username": "ada", "password": USER["password"]})
+    wrong = await client.post("/auth/token", data={"username": "ada", "password": "nope"})
+    assert ok.status_code == 200 and ok.json()["token_type"] == "bearer"
+    assert wrong.status_code == 401
@@ -0,0 +1,69 @@
+import pytest
+from pymongo import ASCENDING
+
+pytestmark = pytest.mark.anyio
+
+
+def _reading(i):
+    return {"temperature": 20 + i, "humidity": 50, "co2_level": 410, "location": f"sensor-{i}"}
+
+
+async def test_bulk_insert_writes_in_chunks(client, mongo):
+    response = await client.post("/climate/bulk", params={"chunk_size": 4}, json=[_reading(i) for i in range(10)])
+    body = response.json()
+
+    assert response.status_code == 200
+    assert (body["received"], body["inserted"], body["failed"]) == (10, 10, 0)
+    assert [(batch["batch"], batch["received"], batch["inserted"]) for batch in body["batches"]] == \
+           [(0, 4, 4), (1, 4, 4), (2, 2, 2)]
+    assert await mongo["climate_data"].count_documents({}) == 10
+
+
+async def test_bulk_insert_reports_index_of_bad_reading(client):
+    readings = [{"temperature": 20, "humidity": 50, "co2_level": 410, "location": "Karachi"} for _ in range(5)]
+    del readings[3]["temperature"]
+
+    response = await client.post("/climate/bulk", params={"chunk_size": 2}, json=readings)
+    body = response.json()
+    assert response.status_code == 200
+    assert (body["received"], body["inserted"], body["failed"]) == (5, 4, 1)
+    errors = [error for batch in body["batches"] for error in batch["errors"]]
+    assert [error["index"] for error in errors] == [3]
+    assert "temperature" in errors[0]["error"]
+
+
+async def test_bulk_insert_reports_index_of_rejected_write(client, mongo):
+    await mongo["climate_data"].create_index([("location", ASCENDING)], unique=True)
+    readings = [_reading(i) for i in range(4)] + [_reading(1), _reading(5)]
+
+    body = (await client.post("/climate/bulk", params={"chunk_size": 3}, json=readings)).json()
+
+    assert (body["inserted"], body["failed"]) == (5, 1)
+    errors = [error for batch in body["batches"] for error in batch["errors"]]
+    assert [error["index"] for error in errors] == [4]
+
+
+async def test_ndjson_bulk_insert_reports_index_of_invalid_line(client):
+    lines = b'{"temperature": 1, "humidity": 2, "co2_level": 3, "location": "K"}\n{oops\n' \
+            b'{"temperature": 4, "humidity": 5, "co2_level": 6, "location": "K"}\n'
+    response = await client.post("/climate/bulk", content=lines, headers={"Content-Type": "application/x-ndjson"})
+    body = response.json()
+    assert (body["inserted"], body["failed"]) == (2, 1)
+    assert body["batches"][0]["errors"] == [{"index": 1, "error": "Invalid JSON"}]
+
+
+async def test_ndjson_without_trailing_newline_keeps_last_line(client):
+    lines = b"\n".join(
+        b'{"temperature": %d, "humidity": 2, "co2_level": 3, "location": "K"}' % i for i in range(5)
+    )
+    response = await client.post("/climate/bulk", params={"chunk_size": 2}, content=lines,
+                                 headers={"Content-Type": "application/x-ndjson"})
+    body = response.json()
+    assert (body["received"], body["inserted"]) == (5, 5)
+    assert len(body["batches"]) == 3
+
+
+@pytest.mark.parametrize("content", [b'{"temperature": 1}', b"not json"])
+async def test_bulk_insert_rejects_body_that_is_not_an_array(client, content):
+    response = await client.post("/climate/bulk", content=content, headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.database import decode_cursor, encode_cursor, keyset_page
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2024, 1, 1)
+
+
+def test_cursor_round_trip():
+    values = {"timestamp": START + timedelta(minutes=90), "_id": ObjectId(), "location": "Karachi", "n": 3}
+    assert decode_cursor(encode_cursor(values)) == values
+
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+async def test_keyset_page_breaks_timestamp_ties_by_id(mongo):
+    collection = mongo["climate_data"]
+    # Three readings share each timestamp, so pages must split runs of equal timestamps
+    documents = [{"timestamp": START + timedelta(hours=i // 3), "location": "K", "n": i} for i in range(10)]
+    await collection.insert_many(documents)
+    expected = sorted(documents, key=lambda d: (d["timestamp"], d["_id"]))
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = await keyset_page(collection, {}, ["timestamp", "_id"], after=cursor, limit=2)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert [d["_id"] for d in seen] == [str(d["_id"]) for d in expected]
+
+
+async def test_keyset_page_descending(mongo):
+    collection = mongo["notifications"]
+    await collection.insert_many([{"timestamp": START + timedelta(minutes=i % 2)} for i in range(5)])
+
+    first, cursor = await keyset_page(collection, {}, ["timestamp", "_id"], limit=3, descending=True)
+    rest, last_cursor = await keyset_page(collection, {}, ["timestamp", "_id"], after=cursor, limit=3, descending=True)
+    keys = [(d["timestamp"], d["_id"]) for d in first + rest]
+    assert len(set(d["_id"] for d in first + rest)) == 5
+    assert keys == sorted(keys, reverse=True)
+    assert last_cursor is None
+
+
+async def test_cursor_from_another_listing_is_rejected(mongo):
+    cursor = encode_cursor({"timestamp": START})
+    with pytest.raises(ValueError):
+        await keyset_page(mongo["climate_data"], {}, ["timestamp", "_id"], after=cursor)
+
+
+async def test_list_climate_pages_with_next_cursor_header(client):
+    readings = [{"temperature": 20 + i, "humidity": 50, "co2_level": 410, "location": "Karachi",
+                 "timestamp": (START + timedelta(hours=i)).isoformat()} for i in range(5)]
+    assert (await client.post("/climate/bulk", json=readings)).json()["inserted"] == 5
+
+    first = await client.get("/climate/", params={"limit": 3})
+    assert first.status_code == 200
+    assert [r["temperature"] for r in first.json()] == [20, 21, 22]
+    second = await client.get("/climate/", params={"limit": 3, "after": first.headers["x-next-cursor"]})
+    assert [r["temperature"] for r in second.json()] == [23, 24]
+    assert "x-next-cursor" not in second.headers
+
+
+async def test_list_climate_rejects_malformed_cursor(client):
+    response = await client.get("/climate/", params={"after": "garbage"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Malformed cursor"
+
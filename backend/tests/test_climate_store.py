@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.climate_store import ClimateStore
+
+QUERIES = [
+    {},
+    {"country": "Japan"},
+    {"city": "Lahore"},
+    {"country": "Pakistan", "city": "Karachi"},
+    {"country": "Japan", "city": "Karachi"},
+    {"city": "Nowhere"},
+    {"start_date": "2024-01-20"},
+    {"country": "Pakistan", "start_date": "2024-01-10", "end_date": "2024-01-20"},
+    {"city": "Tokyo", "end_date": "2024-01-05"},
+    {"start_date": "2024-03-01"},
+]
+
+
+def _frame(seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=31)
+    locations = [("Pakistan", "Lahore"), ("Japan", "Tokyo"), ("Pakistan", "Karachi"), ("Japan", "Osaka")]
+    frame = pd.concat([
+        pd.DataFrame({"date": dates, "country": country, "city": city, "temperature": rng.normal(size=len(dates))})
+        for country, city in locations
+    ])
+    # Shuffled rows, and categories in generation order rather than lexical order
+    frame = frame.sample(frac=1, random_state=seed).reset_index(drop=True)
+    for col in ("country", "city"):
+        frame[col] = pd.Categorical(frame[col], categories=pd.unique(frame[col]))
+    return frame
+
+
+def _expected(frame, city=None, country=None, start_date=None, end_date=None):
+    # The boolean-mask filter the store replaced
+    mask = pd.Series(True, index=frame.index)
+    if country:
+        mask &= frame["country"] == country if "country" in frame.columns else False
+    if city:
+        mask &= frame["city"] == city if "city" in frame.columns else False
+    if start_date:
+        mask &= frame["date"] >= pd.Timestamp(start_date)
+    if end_date:
+        mask &= frame["date"] <= pd.Timestamp(end_date)
+    return frame[mask]
+
+
+def _rows(df):
+    return sorted(zip(df["date"], df["temperature"]))
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_query_matches_mask_filter(query):
+    frame = _frame()
+    assert _rows(ClimateStore(frame).query(**query)) == _rows(_expected(frame, **query))
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_row_ranges_cover_matching_rows_in_order(query):
+    store = ClimateStore(_frame())
+    ranges = store.row_ranges(**query)
+    assert all(lo < hi for lo, hi in ranges)
+    assert all(prev[1] < nxt[0] for prev, nxt in zip(ranges, ranges[1:])), "ranges are sorted and merged"
+    covered = pd.concat([store.frame.iloc[lo:hi] for lo, hi in ranges]) if ranges else store.frame.iloc[0:0]
+    assert _rows(covered) == _rows(_expected(store.frame, **query))
+
+
+def test_partitions_are_lexically_ordered_with_unordered_categories():
+    store = ClimateStore(_frame())
+    assert store.partitions == sorted(store.partitions)
+    for lo, hi in store.row_ranges(city="Osaka"):
+        assert store.frame["date"].iloc[lo:hi].is_monotonic_increasing
+
+
+@pytest.mark.parametrize("offset,limit", [(0, 10), (25, 10), (31, 31), (60, 100), (124, 5), (200, 5)])
+def test_window_pages_through_the_matching_rows(offset, limit):
+    store = ClimateStore(_frame())
+    ranges = store.row_ranges(country="Pakistan", start_date="2024-01-03")
+    matching = store.query(country="Pakistan", start_date="2024-01-03")
+    assert _rows(store.window(ranges, offset, limit)) == _rows(matching.iloc[offset:offset + limit])
+
+
+@pytest.mark.parametrize("missing", ["city", "country"])
+@pytest.mark.parametrize("query", QUERIES)
+def test_unpartitioned_fallback_matches_mask_filter(missing, query):
+    frame = _frame().drop(columns=[missing])
+    store = ClimateStore(frame)
+    assert store.row_ranges(**query) is None
+    expected = _expected(frame, **query) if missing not in query else frame.iloc[0:0]
+    assert _rows(store.query(**query)) == _rows(expected)
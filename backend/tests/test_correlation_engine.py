@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.correlation_engine import CorrelationEngine, CorrelationStats
+
+VARIABLES = ["temperature", "humidity", "co2_levels", "rainfall"]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(11)
+    frames = []
+    for country, city in [("Japan", "Tokyo"), ("Japan", "Osaka"), ("Pakistan", "Karachi")]:
+        n = 400
+        temperature = rng.normal(20, 5, n)
+        df = pd.DataFrame({
+            "country": country, "city": city,
+            "temperature": temperature,
+            "humidity": 80 - 1.5 * temperature + rng.normal(0, 4, n),
+            # Large offset, so the accumulator's shift matters
+            "co2_levels": 415 + 0.3 * temperature + rng.normal(0, 1, n),
+            "rainfall": rng.gamma(1, 2, n),
+        })
+        # Missing readings in different rows per variable: correlations are pairwise-complete
+        for column, rate in (("humidity", 0.1), ("rainfall", 0.25), ("co2_levels", 0.05)):
+            df.loc[rng.random(n) < rate, column] = np.nan
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _assert_matches(actual: pd.DataFrame, rows: pd.DataFrame):
+    expected = rows[VARIABLES].corr()
+    np.testing.assert_allclose(actual.loc[VARIABLES, VARIABLES].to_numpy(), expected.to_numpy(), atol=1e-12)
+
+
+@pytest.mark.parametrize("filters", [{}, {"country": "Japan"}, {"city": "Karachi"}])
+def test_merged_matrix_matches_dataframe_corr(frame, filters):
+    engine = CorrelationEngine(frame)
+    rows = frame
+    for column, value in filters.items():
+        rows = rows[rows[column] == value]
+    _assert_matches(engine.matrix(**filters), rows)
+
+
+def test_appended_rows_match_corr_of_all_rows(frame):
+    first, second = frame.iloc[:500], frame.iloc[500:]
+    engine = CorrelationEngine(first)
+    engine.append(second)
+    _assert_matches(engine.matrix(), frame)
+    _assert_matches(engine.matrix(city="Osaka"), frame[frame["city"] == "Osaka"])
+
+
+def test_stats_merge_equals_single_pass(frame):
+    values = frame[VARIABLES].to_numpy(dtype=np.float64)
+    shift = np.nanmean(values, axis=0)
+    whole = CorrelationStats(shift).update(values)
+    merged = CorrelationStats(shift)
+    for block in np.array_split(values, 7):
+        merged.merge(CorrelationStats(shift).update(block))
+    np.testing.assert_allclose(merged.correlation(), whole.correlation(), atol=1e-12)
+    np.testing.assert_allclose(whole.correlation(), frame[VARIABLES].corr().to_numpy(), atol=1e-12)
+
+
+def test_undefined_correlations_are_nan():
+    df = pd.DataFrame({"city": "A", "country": "B", "a": [1.0, 2.0, 3.0], "constant": [5.0, 5.0, 5.0],
+                       "sparse": [1.0, np.nan, np.nan]})
+    matrix = CorrelationEngine(df).matrix()
+    assert np.isnan(matrix.loc["a", "constant"])
+    assert np.isnan(matrix.loc["a", "sparse"])
+    assert matrix.loc["a", "a"] == pytest.approx(1.0)
+
+
+def test_unknown_location_has_no_matrix(frame):
+    assert CorrelationEngine(frame).matrix(city="Atlantis") is None
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.downsampling import downsample_frame, lttb_indices, minmax_indices
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=np.float64)
+    y = np.sin(x / 25) * 10 + rng.normal(0, 1, n)
+    return x, y
+
+
+@pytest.mark.parametrize("n,max_points", [(1000, 3), (1000, 50), (1001, 999), (10, 4)])
+def test_lttb_keeps_endpoints_within_budget(n, max_points):
+    x, y = _series(n)
+    indices = lttb_indices(x, y, max_points)
+    assert len(indices) == max_points
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_keeps_an_isolated_spike():
+    x, y = _series(2000)
+    y[1234] = 500.0
+    assert 1234 in lttb_indices(x, y, 100)
+
+
+def test_lttb_returns_everything_when_under_budget():
+    x, y = _series(20)
+    assert lttb_indices(x, y, 50).tolist() == list(range(20))
+
+
+@pytest.mark.parametrize("n,max_points", [(1000, 2), (1000, 51), (997, 100), (10, 9)])
+def test_minmax_stays_within_budget_and_keeps_extrema(n, max_points):
+    _, y = _series(n)
+    indices = minmax_indices(y, max_points)
+    assert len(indices) <= max_points
+    assert np.argmin(y) in indices and np.argmax(y) in indices
+
+
+def test_minmax_keeps_each_bucket_extremes_and_skips_nans():
+    _, y = _series(1000)
+    y[::7] = np.nan
+    y[500] = -100.0
+    y[501] = 100.0
+    indices = minmax_indices(y, 20)
+    assert {500, 501} <= set(indices.tolist())
+    assert not np.isnan(y[indices]).any()
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("max_points", [2, 3, 10, 37, 200])
+def test_downsample_frame_caps_rows_and_keeps_first_and_last(method, max_points):
+    n = 5000
+    x, y = _series(n)
+    df = pd.DataFrame({
+        "date": pd.date_range("2000-01-01", periods=n),
+        "temperature": y,
+        "humidity": np.cos(x / 40) * 20 + 50,
+        "rainfall": np.where(x % 11 == 0, np.nan, x % 13),
+    })
+    out = downsample_frame(df, max_points, method)
+    assert len(out) <= max_points
+    assert out.index[0] == 0 and out.index[-1] == n - 1
+    assert out["date"].is_monotonic_increasing
+
+
+def test_downsample_frame_minmax_keeps_every_variables_extremes():
+    n = 3000
+    x, y = _series(n)
+    df = pd.DataFrame({"date": pd.date_range("2000-01-01", periods=n), "temperature": y, "humidity": -y[::-1]})
+    df.loc[1000, "temperature"] = 99.0
+    df.loc[2000, "humidity"] = -99.0
+    out = downsample_frame(df, 100, "minmax")
+    assert {1000, 2000} <= set(out.index)
+
+
+def test_downsample_frame_leaves_small_frames_alone():
+    df = pd.DataFrame({"date": pd.date_range("2000-01-01", periods=5), "temperature": range(5)})
+    assert downsample_frame(df, 10) is df
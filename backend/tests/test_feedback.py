@@ -0,0 +1,34 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _submit(client, count):
+    for i in range(count):
+        entry = {"name": f"user {i}", "email": f"user{i}@example.com", "message": f"note {i}", "rating": i % 5 + 1}
+        assert (await client.post("/feedback/", json=entry)).status_code == 200
+
+
+async def test_listing_pages_through_validated_entries(client):
+    await _submit(client, 5)
+
+    first = await client.get("/feedback/", params={"limit": 3})
+    body = first.json()
+    assert first.status_code == 200
+    assert [item["name"] for item in body["items"]] == ["user 0", "user 1", "user 2"]
+    assert all("_id" not in item for item in body["items"])
+    assert body["next_cursor"] == first.headers["X-Next-Cursor"]
+
+    rest = (await client.get("/feedback/", params={"limit": 3, "after": body["next_cursor"]})).json()
+    assert [item["name"] for item in rest["items"]] == ["user 3", "user 4"]
+    assert rest["next_cursor"] is None
+
+
+async def test_listing_returns_only_requested_fields(client):
+    await _submit(client, 2)
+
+    body = (await client.get("/feedback/", params={"fields": "name,rating"})).json()
+    assert body["items"] == [{"name": "user 0", "rating": 1}, {"name": "user 1", "rating": 2}]
+
+    unknown = await client.get("/feedback/", params={"fields": "name,_id"})
+    assert unknown.status_code == 400
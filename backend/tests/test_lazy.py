@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services import lazy
+from app.services.lazy import LazyService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def slow_service(monkeypatch):
+    monkeypatch.setattr(lazy, "registry", {})
+
+    def build():
+        time.sleep(0.2)
+        return {"built": True}
+    return LazyService("slow", build)
+
+
+async def test_aget_builds_off_the_event_loop(slow_service):
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    instance = await slow_service.aget()
+    task.cancel()
+
+    assert instance == {"built": True}
+    assert ticks >= 5
+    assert slow_service.loaded
+
+
+async def test_concurrent_agets_share_one_build(slow_service):
+    instances = await asyncio.gather(*(slow_service.aget() for _ in range(5)))
+    assert all(instance is instances[0] for instance in instances)
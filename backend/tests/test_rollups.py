@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.rollup_service import AGGREGATIONS, GRAINS, RollupEngine
+
+VARIABLES = ["temperature", "rainfall"]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(3)
+    dates = pd.date_range("2022-11-15", "2024-02-10")
+    frames = []
+    for country, city in [("Japan", "Tokyo"), ("Pakistan", "Karachi"), ("Pakistan", "Lahore")]:
+        frames.append(pd.DataFrame({
+            "date": dates, "country": country, "city": city,
+            "temperature": rng.normal(20, 6, len(dates)),
+            # Gaps, so count and mean must skip missing readings
+            "rainfall": np.where(rng.random(len(dates)) < 0.2, np.nan, rng.gamma(1, 3, len(dates))),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _expected(frame, grain):
+    grouped = frame.groupby(["country", "city", pd.Grouper(key="date", **GRAINS[grain])], observed=True)
+    return grouped[VARIABLES].agg(list(AGGREGATIONS))
+
+
+@pytest.mark.parametrize("grain", list(GRAINS))
+def test_cube_matches_groupby_on_raw_rows(frame, grain):
+    engine = RollupEngine(frame)
+    result = engine.query(grain, list(AGGREGATIONS), VARIABLES)
+    expected = _expected(frame, grain)
+
+    assert result.index.get_level_values("period").tolist() == expected.index.get_level_values("date").tolist()
+    for variable in VARIABLES:
+        for agg in AGGREGATIONS:
+            np.testing.assert_allclose(result[(variable, agg)].to_numpy(float),
+                                       expected[(variable, agg)].to_numpy(float), rtol=1e-12, equal_nan=True)
+
+
+def test_weeks_start_on_monday(frame):
+    periods = RollupEngine(frame).query("week", ["count"], ["temperature"]).index.get_level_values("period")
+    assert (periods.weekday == 0).all()
+
+
+def test_query_filters_location_and_period(frame):
+    engine = RollupEngine(frame)
+    result = engine.query("month", ["mean"], ["temperature"], country="Pakistan", city="Lahore",
+                          start_date="2023-03-15", end_date="2023-06-30")
+
+    rows = frame[(frame["city"] == "Lahore") & (frame["date"] >= "2023-03-01") & (frame["date"] <= "2023-06-30")]
+    expected = rows.groupby(pd.Grouper(key="date", freq="MS"))["temperature"].mean()
+    assert result.index.get_level_values("city").unique().tolist() == ["Lahore"]
+    # The period containing start_date is included whole
+    assert result.index.get_level_values("period").tolist() == expected.index.tolist()
+    np.testing.assert_allclose(result[("temperature", "mean")].to_numpy(), expected.to_numpy())
+
+
+def test_rolling_window_sees_history_before_start_date(frame):
+    engine = RollupEngine(frame)
+    result = engine.query("month", ["mean"], ["temperature"], city="Tokyo", start_date="2023-06-01", window=3)
+
+    monthly = _expected(frame[frame["city"] == "Tokyo"], "month")[("temperature", "mean")].droplevel([0, 1])
+    expected = monthly.rolling(3, min_periods=1).mean().loc["2023-06-01":]
+    np.testing.assert_allclose(result[("temperature", "mean")].to_numpy(), expected.to_numpy())
+
+
+def test_built_from_partitions_matches_whole_frame(frame):
+    whole = RollupEngine(frame)
+    parts = RollupEngine.from_partitions(group for _, group in frame.groupby("city"))
+    for grain in GRAINS:
+        pd.testing.assert_frame_equal(parts.query(grain, list(AGGREGATIONS), VARIABLES),
+                                      whole.query(grain, list(AGGREGATIONS), VARIABLES), check_index_type=False)
+
+
+def test_rejects_unknown_grain_aggregation_and_variable(frame):
+    engine = RollupEngine(frame)
+    with pytest.raises(ValueError, match="grain"):
+        engine.query("hour", ["mean"], VARIABLES)
+    with pytest.raises(ValueError, match="aggregation"):
+        engine.query("day", ["median"], VARIABLES)
+    with pytest.raises(ValueError, match="variable"):
+        engine.query("day", ["mean"], ["snowfall"])
@@ -0,0 +1,44 @@
+import os
+import time
+
+import pytest
+
+from app.services import training_jobs as training_module
+from app.services.training_jobs import TrainingJobManager, prune_artifacts
+
+
+def test_prune_artifacts_keeps_the_newest(tmp_path):
+    versions = ["20240101000000-aaaaaa", "20240301000000-cccccc", "20240201000000-bbbbbb", "20240401000000-dddddd"]
+    for version in versions:
+        (tmp_path / f"model-{version}.pkl").write_bytes(b"")
+    (tmp_path / "model.pkl").write_bytes(b"")
+
+    prune_artifacts(keep=2, directory=str(tmp_path))
+
+    assert sorted(os.listdir(tmp_path)) == ["model-20240301000000-cccccc.pkl", "model-20240401000000-dddddd.pkl",
+                                            "model.pkl"]
+
+
+def test_job_history_is_capped(monkeypatch):
+    monkeypatch.setattr(training_module, "KEEP_JOBS", 3)
+
+    def finish(self, job):
+        job["status"] = "succeeded"
+        with self._lock:
+            self._active = None
+    monkeypatch.setattr(TrainingJobManager, "_supervise", finish)
+
+    manager = TrainingJobManager()
+    submitted = []
+    for _ in range(5):
+        submitted.append(manager.submit()["id"])
+        # The supervising thread clears the active job; wait for it
+        for _ in range(100):
+            if manager._active is None:
+                break
+            time.sleep(0.01)
+        else:
+            pytest.fail("job did not finish")
+
+    assert [job["id"] for job in manager.list()] == submitted[-3:]
+    assert manager.get(submitted[0]) is None
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from app.services import weather_cache as cache_module
+from app.services.weather_cache import WeatherCache
+from app.services.weather_client import WeatherAPIError
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+class Upstream:
+    """Counts fetches; each returns a fresh value after a short delay, or raises `error`."""
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error is not None:
+            raise self.error
+        return {"call": self.calls}
+
+
+async def test_concurrent_misses_share_one_fetch(clock):
+    cache, upstream = WeatherCache(), Upstream()
+
+    results = await asyncio.gather(*(
+        cache.get_or_fetch("weather", "London", "UK", 60, upstream.fetch) for _ in range(10)
+    ))
+
+    assert upstream.calls == 1
+    assert results == [{"call": 1}] * 10
+    assert (cache.misses, cache.coalesced) == (1, 9)
+
+
+async def test_locations_are_normalized(clock):
+    cache, upstream = WeatherCache(), Upstream()
+    await cache.get_or_fetch("weather", "London", "UK", 60, upstream.fetch)
+    await cache.get_or_fetch("weather", " london ", "uk", 60, upstream.fetch)
+    await cache.get_or_fetch("forecast", "London", "UK", 60, upstream.fetch)
+    assert upstream.calls == 2
+
+
+async def test_entries_expire_after_their_ttl(clock):
+    cache, upstream = WeatherCache(), Upstream()
+    fetch = lambda: cache.get_or_fetch("weather", "Tokyo", "JP", 60, upstream.fetch)
+
+    assert await fetch() == {"call": 1}
+    clock.now += 59
+    assert await fetch() == {"call": 1}
+    clock.now += 1
+    assert await fetch() == {"call": 2}
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+async def test_not_found_is_cached_negatively(clock):
+    cache = WeatherCache(negative_ttl=30)
+    upstream = Upstream(error=WeatherAPIError("city not found", status_code=404))
+
+    for _ in range(3):
+        with pytest.raises(WeatherAPIError, match="city not found"):
+            await cache.get_or_fetch("weather", "Atlantis", "XX", 60, upstream.fetch)
+    assert upstream.calls == 1
+    assert cache.negative_hits == 2
+
+    clock.now += 30
+    with pytest.raises(WeatherAPIError):
+        await cache.get_or_fetch("weather", "Atlantis", "XX", 60, upstream.fetch)
+    assert upstream.calls == 2
+
+
+async def test_other_errors_are_not_cached(clock):
+    cache = WeatherCache()
+    upstream = Upstream(error=WeatherAPIError("Weather provider timed out"))
+
+    for _ in range(2):
+        with pytest.raises(WeatherAPIError):
+            await cache.get_or_fetch("weather", "Paris", "FR", 60, upstream.fetch)
+    assert upstream.calls == 2
+
+
+async def test_least_recently_used_entry_is_evicted(clock):
+    cache, upstream = WeatherCache(max_entries=2), Upstream()
+    get = lambda city: cache.get_or_fetch("weather", city, "XX", 60, upstream.fetch)
+
+    await get("a")
+    await get("b")
+    await get("a")  # "b" is now the least recently used
+    await get("c")
+    assert cache.evictions == 1
+
+    calls = upstream.calls
+    await get("a")
+    assert upstream.calls == calls
+    await get("b")
+    assert upstream.calls == calls + 1